@@ -1,147 +1,173 @@
-import pygame, sys, random
-from pygame.math import Vector2
-
-pygame.init()
-
-title_font = pygame.font.Font(None, 60)
-score_font = pygame.font.Font(None, 40)
+import pygame, sys, time, random, argparse
+from snake_core import SnakeGame, number_of_cells, UP, DOWN, LEFT, RIGHT, ATE, DIED
+from snake_agent import Autopilot
 
 GREEN = (173, 204, 96)
 DARK_GREEN = (43, 51, 24)
 
 cell_size = 30
-number_of_cells = 25
 
 OFFSET = 75
 
-class Food:
-	def __init__(self, snake_body):
-		self.position = self.generate_random_pos(snake_body)
-
-	def draw(self):
-		food_rect = pygame.Rect(OFFSET + self.position.x * cell_size, OFFSET + self.position.y * cell_size, 
-			cell_size, cell_size)
-		screen.blit(food_surface, food_rect)
-
-	def generate_random_cell(self):
-		x = random.randint(0, number_of_cells-1)
-		y = random.randint(0, number_of_cells-1)
-		return Vector2(x, y)
-
-	def generate_random_pos(self, snake_body):
-		position = self.generate_random_cell()
-		while position in snake_body:
-			position = self.generate_random_cell()
-		return position
-
-class Snake:
-	def __init__(self):
-		self.body = [Vector2(6, 9), Vector2(5,9), Vector2(4,9)]
-		self.direction = Vector2(1, 0)
-		self.add_segment = False
-		self.eat_sound = pygame.mixer.Sound("Snake/Sounds/eat.mp3")
-		self.wall_hit_sound = pygame.mixer.Sound("Snake/Sounds/wall.mp3")
-
-	def draw(self):
-		for segment in self.body:
-			segment_rect = (OFFSET + segment.x * cell_size, OFFSET+ segment.y * cell_size, cell_size, cell_size)
-			pygame.draw.rect(screen, DARK_GREEN, segment_rect, 0, 7)
-
-	def update(self):
-		self.body.insert(0, self.body[0] + self.direction)
-		if self.add_segment == True:
-			self.add_segment = False
-		else:
-			self.body = self.body[:-1]
-
-	def reset(self):
-		self.body = [Vector2(6,9), Vector2(5,9), Vector2(4,9)]
-		self.direction = Vector2(1, 0)
-
-class Game:
-	def __init__(self):
-		self.snake = Snake()
-		self.food = Food(self.snake.body)
+# One simulation tick every STEP_MS of game time, whatever the frame rate.
+# speed scales game time against wall time (2 = twice as fast).
+STEP_MS = 200
+MIN_SPEED, MAX_SPEED = 0.25, 64
+# Ticks run per frame before the simulation is allowed to fall behind
+MAX_STEPS_PER_FRAME = 100
+
+# Sounds and images, loaded once and shared by every Game
+_assets = {}
+
+def load_sound(path):
+	if path not in _assets:
+		_assets[path] = pygame.mixer.Sound(path)
+	return _assets[path]
+
+def load_image(path):
+	if path not in _assets:
+		_assets[path] = pygame.image.load(path)
+	return _assets[path]
+
+class Game(SnakeGame):
+	def __init__(self, sound=True, rng=None):
+		SnakeGame.__init__(self, number_of_cells, rng=rng)
+		self.eat_sound = load_sound("Snake/Sounds/eat.mp3") if sound else None
+		self.wall_hit_sound = load_sound("Snake/Sounds/wall.mp3") if sound else None
 		self.state = "RUNNING"
-		self.score = 0
-
-	def draw(self):
-		self.food.draw()
-		self.snake.draw()
+		self.autopilot = None
+
+	def draw(self, screen):
+		self.draw_food(screen)
+		self.draw_snake(screen)
+
+	def draw_food(self, screen):
+		if self.food is not None:
+			x, y = self.food % number_of_cells, self.food // number_of_cells
+			food_rect = pygame.Rect(OFFSET + x * cell_size, OFFSET + y * cell_size, cell_size, cell_size)
+			screen.blit(load_image("Snake/Graphics/food.png"), food_rect)
+
+	def draw_snake(self, screen):
+		for cell in self.body:
+			x, y = cell % number_of_cells, cell // number_of_cells
+			segment_rect = (OFFSET + x * cell_size, OFFSET+ y * cell_size, cell_size, cell_size)
+			pygame.draw.rect(screen, DARK_GREEN, segment_rect, 0, 7)
 
 	def update(self):
 		if self.state == "RUNNING":
-			self.snake.update()
-			self.check_collision_with_food()
-			self.check_collision_with_edges()
-			self.check_collision_with_tail()
-
-	def check_collision_with_food(self):
-		if self.snake.body[0] == self.food.position:
-			self.food.position = self.food.generate_random_pos(self.snake.body)
-			self.snake.add_segment = True
-			self.score += 1
-			self.snake.eat_sound.play()
-
-	def check_collision_with_edges(self):
-		if self.snake.body[0].x == number_of_cells or self.snake.body[0].x == -1:
-			self.game_over()
-		if self.snake.body[0].y == number_of_cells or self.snake.body[0].y == -1:
-			self.game_over()
+			if self.autopilot is not None:
+				self.direction = self.autopilot.next_direction(self) or self.direction
+			result = SnakeGame.update(self)
+			if result == ATE:
+				if self.eat_sound:
+					self.eat_sound.play()
+			elif result == DIED:
+				self.game_over()
+			return result
 
 	def game_over(self):
-		self.snake.reset()
-		self.food.position = self.food.generate_random_pos(self.snake.body)
+		self.reset()
 		self.state = "STOPPED"
-		self.score = 0
-		self.snake.wall_hit_sound.play()
-
-	def check_collision_with_tail(self):
-		headless_body = self.snake.body[1:]
-		if self.snake.body[0] in headless_body:
-			self.game_over()
-
-screen = pygame.display.set_mode((2*OFFSET + cell_size*number_of_cells, 2*OFFSET + cell_size*number_of_cells))
-
-pygame.display.set_caption("Retro Snake")
-
-clock = pygame.time.Clock()
-
-game = Game()
-food_surface = pygame.image.load("Snake/Graphics/food.png")
-
-SNAKE_UPDATE = pygame.USEREVENT
-pygame.time.set_timer(SNAKE_UPDATE, 200) 	
-
-while True:
-	for event in pygame.event.get():
-		if event.type == SNAKE_UPDATE:
+		if self.wall_hit_sound:
+			self.wall_hit_sound.play()
+
+	def toggle_autopilot(self):
+		self.autopilot = None if self.autopilot else Autopilot(number_of_cells)
+
+def main(speed=1, autopilot=False):
+	pygame.init()
+
+	title_font = pygame.font.Font(None, 60)
+	score_font = pygame.font.Font(None, 40)
+
+	screen = pygame.display.set_mode((2*OFFSET + cell_size*number_of_cells, 2*OFFSET + cell_size*number_of_cells))
+
+	pygame.display.set_caption("Retro Snake")
+
+	clock = pygame.time.Clock()
+
+	game = Game()
+	if autopilot:
+		game.toggle_autopilot()
+	pending_ms = 0
+
+	while True:
+		for event in pygame.event.get():
+			if event.type == pygame.QUIT:
+				pygame.quit()
+				sys.exit()
+
+			if event.type == pygame.KEYDOWN:
+				if game.state == "STOPPED":
+					game.state = "RUNNING"
+				if event.key == pygame.K_UP and game.direction != DOWN:
+					game.direction = UP
+				if event.key == pygame.K_DOWN and game.direction != UP:
+					game.direction = DOWN
+				if event.key == pygame.K_LEFT and game.direction != RIGHT:
+					game.direction = LEFT
+				if event.key == pygame.K_RIGHT and game.direction != LEFT:
+					game.direction = RIGHT
+				if event.key == pygame.K_a:
+					game.toggle_autopilot()
+				# ] and [ fast-forward and slow down
+				if event.key == pygame.K_RIGHTBRACKET:
+					speed = min(MAX_SPEED, speed * 2)
+				if event.key == pygame.K_LEFTBRACKET:
+					speed = max(MIN_SPEED, speed / 2)
+
+		#Simulation: as many fixed ticks as the elapsed game time calls for
+		pending_ms += clock.get_time() * speed
+		steps = 0
+		while pending_ms >= STEP_MS and steps < MAX_STEPS_PER_FRAME:
 			game.update()
-		if event.type == pygame.QUIT:
-			pygame.quit()
-			sys.exit()
-
-		if event.type == pygame.KEYDOWN:
-			if game.state == "STOPPED":
-				game.state = "RUNNING"
-			if event.key == pygame.K_UP and game.snake.direction != Vector2(0, 1):
-				game.snake.direction = Vector2(0, -1)
-			if event.key == pygame.K_DOWN and game.snake.direction != Vector2(0, -1):
-				game.snake.direction = Vector2(0, 1)
-			if event.key == pygame.K_LEFT and game.snake.direction != Vector2(1, 0):
-				game.snake.direction = Vector2(-1, 0)
-			if event.key == pygame.K_RIGHT and game.snake.direction != Vector2(-1, 0):
-				game.snake.direction = Vector2(1, 0)
-
-	#Drawing
-	screen.fill(GREEN)
-	pygame.draw.rect(screen, DARK_GREEN, 
-		(OFFSET-5, OFFSET-5, cell_size*number_of_cells+10, cell_size*number_of_cells+10), 5)
-	game.draw()
-	title_surface = title_font.render("Retro Snake", True, DARK_GREEN)
-	score_surface = score_font.render(str(game.score), True, DARK_GREEN)
-	screen.blit(title_surface, (OFFSET-5, 20))
-	screen.blit(score_surface, (OFFSET-5, OFFSET + cell_size*number_of_cells +10))
-
-	pygame.display.update()
-	clock.tick(60)
\ No newline at end of file
+			pending_ms -= STEP_MS
+			steps += 1
+		if steps == MAX_STEPS_PER_FRAME:
+			pending_ms = 0
+
+		#Drawing
+		screen.fill(GREEN)
+		pygame.draw.rect(screen, DARK_GREEN,
+			(OFFSET-5, OFFSET-5, cell_size*number_of_cells+10, cell_size*number_of_cells+10), 5)
+		game.draw(screen)
+		title = "Retro Snake" + (" - Autopilot" if game.autopilot else "") + (f" x{speed:g}" if speed != 1 else "")
+		title_surface = title_font.render(title, True, DARK_GREEN)
+		score_surface = score_font.render(str(game.score), True, DARK_GREEN)
+		screen.blit(title_surface, (OFFSET-5, 20))
+		screen.blit(score_surface, (OFFSET-5, OFFSET + cell_size*number_of_cells +10))
+
+		pygame.display.update()
+		clock.tick(60)
+
+def run_headless(ticks, seed=None):
+	"""Run the autopilot unthrottled with no window or sound; a new game starts after each death"""
+	game = Game(sound=False, rng=random.Random(seed))
+	game.toggle_autopilot()
+	scores = []
+	start = time.perf_counter()
+	for _ in range(ticks):
+		score = game.score
+		if game.update() == DIED:
+			scores.append(score)
+			game.state = "RUNNING"
+		elif game.food is None:
+			scores.append(game.score)
+			game.reset()
+	elapsed = time.perf_counter() - start
+	print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s), {len(scores)} games finished")
+	if scores:
+		print(f"average score: {sum(scores) / len(scores):.1f}")
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Retro Snake")
+	parser.add_argument("--speed", type=float, default=1, help="game speed as a multiple of real time")
+	parser.add_argument("--autopilot", action="store_true", help="start with the computer playing")
+	parser.add_argument("--headless", type=int, metavar="TICKS",
+		help="run TICKS autopilot ticks as fast as possible with no window")
+	parser.add_argument("--seed", type=int, default=None)
+	args = parser.parse_args()
+	if args.headless:
+		run_headless(args.headless, args.seed)
+	else:
+		main(args.speed, args.autopilot)
@@ -0,0 +1,192 @@
+# snake_agent.py - Autopilot for Snake
+# Each tick: take the shortest path to the food if the snake could still reach
+# its own tail after eating; otherwise step along a Hamiltonian cycle, chase
+# the tail, or as a last resort take any free cell.
+#
+# Headless benchmark:  python Snake/snake_agent.py [games] [seed] [board size]
+import random
+import sys
+import time
+
+from snake_core import SnakeGame, number_of_cells, UP, DOWN, LEFT, RIGHT, DIED
+
+class Autopilot:
+	"""Chooses directions for a SnakeGame of the given width and height.
+
+	All search state (BFS queue, parents, visit stamps, a scratch occupancy
+	grid) is allocated once here and reused by every search.
+	"""
+	def __init__(self, width=number_of_cells, height=None):
+		self.width = width
+		self.height = height = height or width
+		cells = width * height
+		self.neighbours = []
+		for cell in range(cells):
+			x, y = cell % width, cell // width
+			self.neighbours.append([(y + dy) * width + x + dx for dx, dy in (UP, DOWN, LEFT, RIGHT)
+				if 0 <= x + dx < width and 0 <= y + dy < height])
+
+		self.queue = [0] * cells
+		self.parent = [0] * cells
+		self.seen = [0] * cells
+		self.stamp = 0
+		self.area = 0
+		self.path = [0] * cells
+		self.virtual = bytearray(cells)
+
+		self.cycle_next = self._hamiltonian_cycle()
+
+	def _hamiltonian_cycle(self):
+		"""Successor of each cell on a cycle through the board (-1 for a cell left out).
+
+		Column 0 is the way back up; the other columns are covered by a row
+		serpentine. With an odd number of rows the last two are covered column
+		by column instead. A board with an odd number of cells has no
+		Hamiltonian cycle, so there the bottom left cell is skipped.
+		"""
+		width, height = self.width, self.height
+		order = []
+		serpentine_rows = height if height % 2 == 0 else height - 2
+		for y in range(serpentine_rows):
+			xs = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+			order += [y * width + x for x in xs]
+		if height % 2:
+			for i, x in enumerate(range(width - 1, 0, -1)):
+				ys = (height - 2, height - 1) if i % 2 == 0 else (height - 1, height - 2)
+				order += [y * width + x for y in ys]
+		last_row = height - 1 if height % 2 == 0 or width % 2 == 0 else height - 2
+		order += [y * width for y in range(last_row, -1, -1)]
+
+		cycle_next = [-1] * (width * height)
+		for i, cell in enumerate(order):
+			cycle_next[cell] = order[(i + 1) % len(order)]
+		return cycle_next
+
+	def bfs(self, occupied, start, goal, tail):
+		"""Shortest path start -> goal through free cells (tail counts as free).
+
+		Returns the path length and leaves the cells, first step first, in
+		self.path; returns 0 if goal is unreachable, with the number of cells
+		that were reachable in self.area.
+		"""
+		self.stamp += 1
+		stamp, seen, parent, queue, neighbours = self.stamp, self.seen, self.parent, self.queue, self.neighbours
+		seen[start] = stamp
+		queue[0] = start
+		read, write = 0, 1
+		while read < write:
+			cell = queue[read]
+			read += 1
+			for next_cell in neighbours[cell]:
+				if seen[next_cell] != stamp:
+					if next_cell == goal:
+						parent[next_cell] = cell
+						return self._trace(start, goal)
+					if not occupied[next_cell] or next_cell == tail:
+						seen[next_cell] = stamp
+						parent[next_cell] = cell
+						queue[write] = next_cell
+						write += 1
+		self.area = write
+		return 0
+
+	def _trace(self, start, goal):
+		length = 0
+		cell = goal
+		while cell != start:
+			self.path[length] = cell
+			length += 1
+			cell = self.parent[cell]
+		self.path[:length] = self.path[length - 1::-1]
+		return length
+
+	def tail_reachable_after(self, game, steps, grows):
+		"""Would the head still reach the tail after following self.path[:steps]?"""
+		body = game.body
+		length = len(body) + (1 if grows or game.add_segment else 0)
+		# The new body is the path walked backwards followed by the old body
+		cells = self.path[steps - 1::-1] if steps else []
+		cells = cells[:length]
+		cells += [body[i] for i in range(min(len(body), length - len(cells)))]
+		virtual = self.virtual
+		for cell in cells:
+			virtual[cell] = 1
+		head, tail = cells[0], cells[-1]
+		# A snake that has just eaten keeps its tail for one more tick
+		reachable = self.bfs(virtual, head, tail, tail) > 0 if len(cells) > 1 else True
+		for cell in cells:
+			virtual[cell] = 0
+		return reachable
+
+	def direction_to(self, game, cell):
+		head = game.body[0]
+		return (cell % self.width - head % self.width, cell // self.width - head // self.width)
+
+	def next_direction(self, game):
+		"""Direction for the next update, or None if every move is fatal"""
+		occupied = game.grid.occupied
+		head = game.body[0]
+		tail = -1 if game.add_segment else game.body[-1]
+
+		if game.food is not None:
+			steps = self.bfs(occupied, head, game.food, tail)
+			if steps:
+				first = self.path[0]
+				if self.tail_reachable_after(game, steps, True):
+					return self.direction_to(game, first)
+
+		# No safe way to the food: step along the cycle if that keeps the tail in reach
+		cell = self.cycle_next[head]
+		if cell >= 0 and cell in self.neighbours[head] and (not occupied[cell] or cell == tail):
+			self.path[0] = cell
+			if self.tail_reachable_after(game, 1, cell == game.food):
+				return self.direction_to(game, cell)
+
+		# Chase the tail; one that is about to grow cannot be stepped onto yet
+		steps = self.bfs(occupied, head, game.body[-1], tail)
+		if steps > 1 or steps == 1 and tail >= 0:
+			return self.direction_to(game, self.path[0])
+
+		# Trapped: take the move with the most room
+		best, best_area = None, -1
+		for cell in self.neighbours[head]:
+			if not occupied[cell] or cell == tail:
+				self.bfs(occupied, cell, -1, tail)
+				if self.area > best_area:
+					best, best_area = cell, self.area
+		return None if best is None else self.direction_to(game, best)
+
+def play_game(agent, seed, max_idle=None):
+	"""Headless game; returns (score, ticks). Stops if the snake goes max_idle ticks without eating."""
+	game = SnakeGame(agent.width, agent.height, random.Random(seed))
+	max_idle = max_idle or agent.width * agent.height * max(agent.width, agent.height)
+	ticks = idle = 0
+	while game.food is not None and idle < max_idle:
+		direction = agent.next_direction(game)
+		if direction is None:
+			break
+		game.direction = direction
+		result = game.update()
+		ticks += 1
+		if result == DIED:
+			break
+		idle = 0 if game.add_segment else idle + 1
+	return game.score, ticks
+
+def benchmark(games=20, seed=0, size=number_of_cells):
+	agent = Autopilot(size)
+	total_score = total_ticks = 0
+	start = time.perf_counter()
+	for i in range(games):
+		score, ticks = play_game(agent, seed + i)
+		total_score += score
+		total_ticks += ticks
+	elapsed = time.perf_counter() - start
+	print(f"{games} games on a {size}x{size} board in {elapsed:.1f}s")
+	print(f"average score: {total_score / games:.1f}")
+	print(f"ticks per second: {total_ticks / elapsed:,.0f} ({1e6 * elapsed / total_ticks:.1f} us per tick)")
+
+if __name__ == "__main__":
+	benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+		int(sys.argv[2]) if len(sys.argv) > 2 else 0,
+		int(sys.argv[3]) if len(sys.argv) > 3 else number_of_cells)
@@ -0,0 +1,142 @@
+# snake_batch.py - N games of Snake stepped together in NumPy
+# Same rules as SnakeGame.update in snake_core.py, one array row per game, for
+# training and evaluating agents. Games that die are reset in the same step.
+#
+# Benchmark with random moves:  python Snake/snake_batch.py [games] [steps]
+import sys
+import time
+
+import numpy as np
+
+from snake_core import number_of_cells, UP, DOWN, LEFT, RIGHT, MOVED, ATE, DIED
+
+# Action i moves the head by DIRECTIONS[i]
+DIRECTIONS = np.array([UP, DOWN, LEFT, RIGHT])
+
+class SnakeBatch:
+	"""count games of Snake on a size x size board.
+
+	Each game's body lives in a ring buffer of cell indices: ring[g, head[g]]
+	is the head and the length[g] - 1 entries before it (wrapping) are the
+	rest of the body. occupied[g] counts the body segments on each cell.
+	food is -1 once a board is full.
+	"""
+	def __init__(self, count, size=number_of_cells, seed=None):
+		self.count = count
+		self.size = size
+		self.cells = size * size
+		self.rng = np.random.default_rng(seed)
+		self.games = np.arange(count)
+
+		self.ring = np.zeros((count, self.cells), dtype=np.int32)
+		self.head = np.zeros(count, dtype=np.int32)
+		self.length = np.zeros(count, dtype=np.int32)
+		self.occupied = np.zeros((count, self.cells), dtype=np.uint8)
+		self.direction = np.zeros(count, dtype=np.int8)
+		self.add_segment = np.zeros(count, dtype=bool)
+		self.score = np.zeros(count, dtype=np.int32)
+		self.food = np.zeros(count, dtype=np.int32)
+
+		row, col = size * 9 // 25, max(2, size * 6 // 25)
+		# Tail first, as the ring stores it
+		self.start = np.array([row * size + col - 2, row * size + col - 1, row * size + col])
+		self.reset()
+
+	def reset(self, games=None):
+		"""Restart the given games (a boolean mask or indices; all by default)"""
+		games = self.games if games is None else self.games[games]
+		if not len(games):
+			return
+		self.occupied[games] = 0
+		self.ring[games, :3] = self.start
+		self.occupied[games[:, None], self.start] = 1
+		self.head[games] = 2
+		self.length[games] = 3
+		self.direction[games] = 3  # RIGHT
+		self.add_segment[games] = False
+		self.score[games] = 0
+		self._place_food(games)
+
+	def _place_food(self, games):
+		# A random free cell per game: the largest random key among free cells
+		free = self.occupied[games] == 0
+		keys = self.rng.random(free.shape)
+		keys[~free] = -1
+		food = keys.argmax(axis=1)
+		food[~free.any(axis=1)] = -1
+		self.food[games] = food
+
+	def step(self, actions):
+		"""Advance every game one tick with actions[g] (an index into DIRECTIONS).
+
+		An action that reverses a game's direction is ignored, as the keyboard
+		controls do. Returns (results, scores): MOVED, ATE or DIED per game,
+		and each game's score before any reset, so a dead game's final score.
+		"""
+		actions = np.asarray(actions, dtype=np.int8)
+		reverse = (DIRECTIONS[actions] == -DIRECTIONS[self.direction]).all(axis=1)
+		self.direction = np.where(reverse, self.direction, actions)
+
+		games = self.games
+		heads = self.ring[games, self.head]
+		x = heads % self.size + DIRECTIONS[self.direction, 0]
+		y = heads // self.size + DIRECTIONS[self.direction, 1]
+		alive = (x >= 0) & (x < self.size) & (y >= 0) & (y < self.size)
+		cell = np.where(alive, y * self.size + x, 0)
+
+		# Drop the tail unless the game is growing, then push the new head
+		shrink = games[alive & ~self.add_segment]
+		tails = self.ring[shrink, (self.head[shrink] - self.length[shrink] + 1) % self.cells]
+		self.occupied[shrink, tails] -= 1
+		grow = alive & self.add_segment
+		self.length[grow] += 1
+		self.add_segment[alive] = False
+
+		moved = games[alive]
+		self.head[moved] = (self.head[moved] + 1) % self.cells
+		self.ring[moved, self.head[moved]] = cell[moved]
+		self.occupied[moved, cell[moved]] += 1
+
+		# The head's cell is counted twice if it ran into the body
+		bitten = alive & (self.occupied[games, cell] > 1)
+		ate = alive & ~bitten & (cell == self.food)
+		self.add_segment[ate] = True
+		self.score[ate] += 1
+		self._place_food(games[ate])
+
+		results = np.full(self.count, MOVED, dtype=np.int8)
+		results[ate] = ATE
+		died = ~alive | bitten
+		results[died] = DIED
+		scores = self.score.copy()
+		self.reset(died)
+		return results, scores
+
+	def body(self, game):
+		"""Body cells of one game, head first"""
+		offsets = (self.head[game] - np.arange(self.length[game])) % self.cells
+		return self.ring[game, offsets]
+
+	def observe(self):
+		"""(count, size, size) int8 boards: 0 empty, 1 body, 2 head, 3 food"""
+		boards = (self.occupied > 0).astype(np.int8)
+		boards[self.games, self.ring[self.games, self.head]] = 2
+		has_food = self.food >= 0
+		boards[self.games[has_food], self.food[has_food]] = 3
+		return boards.reshape(self.count, self.size, self.size)
+
+def benchmark(count=4096, steps=1000):
+	batch = SnakeBatch(count, seed=0)
+	rng = np.random.default_rng(1)
+	games = 0
+	start = time.perf_counter()
+	for _ in range(steps):
+		results, _ = batch.step(rng.integers(0, 4, count))
+		games += int((results == DIED).sum())
+	elapsed = time.perf_counter() - start
+	print(f"{count} games x {steps} steps in {elapsed:.2f}s")
+	print(f"{count * steps / elapsed:,.0f} game ticks per second, {games} games finished")
+
+if __name__ == "__main__":
+	benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 4096,
+		int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,99 @@
+# snake_core.py - Snake rules without any drawing, sound or timing
+# Snake/snake.py and snake game.py are front ends for this; snake_agent.py
+# drives it headless.
+import random
+from collections import deque
+
+number_of_cells = 25
+
+UP, DOWN, LEFT, RIGHT = (0, -1), (0, 1), (-1, 0), (1, 0)
+
+# What an update did
+MOVED, ATE, DIED = range(3)
+
+class Grid:
+	"""Board occupancy: a count per cell plus a list of free cells.
+
+	Cells are indexed y * width + x. Free cells are kept in a list with each
+	cell's position in it, so occupying, releasing and picking a random free
+	cell are all constant time however full the board is.
+	"""
+	def __init__(self, width=number_of_cells, height=number_of_cells):
+		self.width = width
+		self.height = height
+		self.occupied = bytearray(width * height)
+		self.free = list(range(width * height))
+		self.free_index = list(range(width * height))
+
+	def occupy(self, cell):
+		self.occupied[cell] += 1
+		if self.occupied[cell] == 1:
+			# Swap the last free cell into this one's slot
+			i = self.free_index[cell]
+			last = self.free.pop()
+			if last != cell:
+				self.free[i] = last
+				self.free_index[last] = i
+
+	def release(self, cell):
+		self.occupied[cell] -= 1
+		if self.occupied[cell] == 0:
+			self.free_index[cell] = len(self.free)
+			self.free.append(cell)
+
+	def random_free_cell(self, rng=random):
+		return rng.choice(self.free) if self.free else None
+
+class SnakeGame:
+	"""One game of Snake on a width x height board (square by default).
+
+	The body is a deque of cell indices, head first. food is a cell index, or
+	None once the snake fills the whole board.
+	"""
+	def __init__(self, width=number_of_cells, height=None, rng=None):
+		self.width = width
+		self.height = height or width
+		self.rng = rng or random.Random()
+		self.grid = Grid(self.width, self.height)
+		self.body = deque()
+		row, col = self.height * 9 // 25, max(2, width * 6 // 25)
+		self.start = [row * width + col, row * width + col - 1, row * width + col - 2]
+		self.reset()
+
+	def reset(self):
+		for cell in self.body:
+			self.grid.release(cell)
+		self.body = deque(self.start)
+		for cell in self.body:
+			self.grid.occupy(cell)
+		self.direction = RIGHT
+		self.add_segment = False
+		self.score = 0
+		self.food = self.grid.random_free_cell(self.rng)
+
+	def next_head(self):
+		"""(x, y) the head moves to on the next update; may be off the board"""
+		head = self.body[0]
+		return head % self.width + self.direction[0], head // self.width + self.direction[1]
+
+	def update(self):
+		"""Advance one tick; returns MOVED, ATE or DIED (the caller resets after DIED)"""
+		x, y = self.next_head()
+		if not (0 <= x < self.width and 0 <= y < self.height):
+			return DIED
+		cell = y * self.width + x
+		if self.add_segment:
+			self.add_segment = False
+		else:
+			self.grid.release(self.body.pop())
+		self.body.appendleft(cell)
+		self.grid.occupy(cell)
+		# The head's cell is counted twice if it ran into the body
+		if self.grid.occupied[cell] > 1:
+			return DIED
+		if cell == self.food:
+			self.add_segment = True
+			self.score += 1
+			self.food = self.grid.random_free_cell(self.rng)
+			return ATE
+		return MOVED
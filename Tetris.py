@@ -1,13 +1,12 @@
 import pygame
-import random
 import sys
+from tetris_core import Tetris, GRID_WIDTH, GRID_HEIGHT, PIECE_CELLS, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP
+from tetris_replay import Recorder, Replayer
 
 # Initialize Pygame
 pygame.init()
 
 # Constants
-GRID_WIDTH = 10
-GRID_HEIGHT = 20
 CELL_SIZE = 30
 GRID_X_OFFSET = 50
 GRID_Y_OFFSET = 50
@@ -26,111 +25,6 @@ PURPLE = (128, 0, 128)
 RED = (255, 0, 0)
 GRAY = (128, 128, 128)
 
-# Tetris pieces (tetrominoes)
-PIECES = {
-    'I': [['.....',
-           '..#..',
-           '..#..',
-           '..#..',
-           '..#..'],
-          ['.....',
-           '.....',
-           '####.',
-           '.....',
-           '.....']],
-    
-    'O': [['.....',
-           '.....',
-           '.##..',
-           '.##..',
-           '.....']],
-    
-    'T': [['.....',
-           '.....',
-           '.#...',
-           '###..',
-           '.....'],
-          ['.....',
-           '.....',
-           '.#...',
-           '.##..',
-           '.#...'],
-          ['.....',
-           '.....',
-           '.....',
-           '###..',
-           '.#...'],
-          ['.....',
-           '.....',
-           '.#...',
-           '##...',
-           '.#...']],
-    
-    'S': [['.....',
-           '.....',
-           '.##..',
-           '##...',
-           '.....'],
-          ['.....',
-           '.#...',
-           '.##..',
-           '..#..',
-           '.....']],
-    
-    'Z': [['.....',
-           '.....',
-           '##...',
-           '.##..',
-           '.....'],
-          ['.....',
-           '..#..',
-           '.##..',
-           '.#...',
-           '.....']],
-    
-    'J': [['.....',
-           '.#...',
-           '.#...',
-           '##...',
-           '.....'],
-          ['.....',
-           '.....',
-           '#....',
-           '###..',
-           '.....'],
-          ['.....',
-           '.##..',
-           '.#...',
-           '.#...',
-           '.....'],
-          ['.....',
-           '.....',
-           '###..',
-           '..#..',
-           '.....']],
-    
-    'L': [['.....',
-           '..#..',
-           '..#..',
-           '.##..',
-           '.....'],
-          ['.....',
-           '.....',
-           '###..',
-           '#....',
-           '.....'],
-          ['.....',
-           '##...',
-           '.#...',
-           '.#...',
-           '.....'],
-          ['.....',
-           '.....',
-           '..#..',
-           '###..',
-           '.....']]
-}
-
 PIECE_COLORS = {
     'I': CYAN,
     'O': YELLOW,
@@ -141,194 +35,125 @@ PIECE_COLORS = {
     'L': ORANGE
 }
 
-class Tetris:
-    def __init__(self):
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.current_piece = self.get_new_piece()
-        self.next_piece = self.get_new_piece()
-        self.score = 0
-        self.level = 1
-        self.lines_cleared = 0
-        self.fall_time = 0
-        self.fall_speed = 500  # milliseconds
+CONTROLS = [
+    "Controls:",
+    "A/D - Move",
+    "S - Soft drop",
+    "W - Rotate",
+    "Space - Hard drop",
+    "R - Restart"
+]
+
+KEY_ACTIONS = {
+    pygame.K_a: LEFT,
+    pygame.K_d: RIGHT,
+    pygame.K_s: SOFT_DROP,
+    pygame.K_w: ROTATE,
+    pygame.K_SPACE: HARD_DROP
+}
+
+class Renderer:
+    """Draws a Tetris game from cached surfaces.
+    
+    Cell tiles are pre-rendered once per colour, the locked stack is redrawn
+    only when tetris.grid_version changes, and text is re-rendered only when
+    its value changes. A frame is then a few blits plus the falling piece.
+    """
+    
+    def __init__(self, font):
+        self.font = font
+        self.tiles = {piece_type: self.make_tile(color, WHITE, CELL_SIZE)
+                      for piece_type, color in PIECE_COLORS.items()}
+        self.small_tiles = {piece_type: self.make_tile(color, WHITE, 20)
+                            for piece_type, color in PIECE_COLORS.items()}
+        self.tiny_tiles = {piece_type: self.make_tile(color, WHITE, 10)
+                           for piece_type, color in PIECE_COLORS.items()}
+        self.empty_tile = self.make_tile(BLACK, GRAY, CELL_SIZE)
+        self.stack = pygame.Surface((GRID_WIDTH * CELL_SIZE, GRID_HEIGHT * CELL_SIZE))
+        self.stack_key = None
+        self.texts = {}
+    
+    def make_tile(self, color, border, size):
+        tile = pygame.Surface((size, size))
+        tile.fill(color)
+        pygame.draw.rect(tile, border, tile.get_rect(), 1)
+        return tile
+    
+    def text(self, value, color=WHITE):
+        """Rendered text surface, cached by string and colour"""
+        key = (value, color)
+        surface = self.texts.get(key)
+        if surface is None:
+            if len(self.texts) > 64:
+                self.texts.clear()
+            surface = self.texts[key] = self.font.render(value, True, color)
+        return surface
+    
+    def draw_grid(self, screen, tetris):
+        key = (id(tetris), tetris.grid_version)
+        if key != self.stack_key:
+            self.stack_key = key
+            for y in range(GRID_HEIGHT):
+                for x in range(GRID_WIDTH):
+                    cell = tetris.grid[y][x]
+                    tile = self.tiles[cell] if cell != 0 else self.empty_tile
+                    self.stack.blit(tile, (x * CELL_SIZE, y * CELL_SIZE))
+        screen.blit(self.stack, (GRID_X_OFFSET, GRID_Y_OFFSET))
+    
+    def draw_piece(self, screen, piece):
+        tile = self.tiles[piece['type']]
+        for x, y in PIECE_CELLS[piece['type']][piece['rotation']]:
+            screen.blit(tile, (GRID_X_OFFSET + (piece['x'] + x) * CELL_SIZE,
+                               GRID_Y_OFFSET + (piece['y'] + y) * CELL_SIZE))
+    
+    def draw_next_pieces(self, screen, pieces):
+        """The next piece, then the rest of the preview queue at a smaller size"""
+        info_x = GRID_X_OFFSET + GRID_WIDTH * CELL_SIZE + 20
+        screen.blit(self.text("Next:"), (info_x, GRID_Y_OFFSET))
         
-    def get_new_piece(self):
-        piece_type = random.choice(list(PIECES.keys()))
-        return {
-            'type': piece_type,
-            'x': GRID_WIDTH // 2 - 2,
-            'y': 0,
-            'rotation': 0,
-            'shape': PIECES[piece_type][0]
-        }
-    
-    def rotate_piece(self, piece):
-        piece_type = piece['type']
-        rotations = PIECES[piece_type]
-        new_rotation = (piece['rotation'] + 1) % len(rotations)
-        return new_rotation, rotations[new_rotation]
-    
-    def is_valid_position(self, piece, dx=0, dy=0, rotation=None):
-        if rotation is None:
-            shape = piece['shape']
-        else:
-            shape = PIECES[piece['type']][rotation]
+        for i, piece in enumerate(pieces):
+            tiles, size = (self.small_tiles, 20) if i == 0 else (self.tiny_tiles, 10)
+            left = info_x if i == 0 else info_x + 50 + i * 55
+            top = GRID_Y_OFFSET + 30 if i == 0 else GRID_Y_OFFSET + 50
+            tile = tiles[piece['type']]
+            for x, y in PIECE_CELLS[piece['type']][piece['rotation']]:
+                screen.blit(tile, (left + x * size, top + y * size))
+    
+    def draw_info(self, screen, tetris):
+        info_x = GRID_X_OFFSET + GRID_WIDTH * CELL_SIZE + 20
         
-        for y, row in enumerate(shape):
-            for x, cell in enumerate(row):
-                if cell == '#':
-                    new_x = piece['x'] + x + dx
-                    new_y = piece['y'] + y + dy
-                    
-                    if (new_x < 0 or new_x >= GRID_WIDTH or 
-                        new_y >= GRID_HEIGHT or
-                        (new_y >= 0 and self.grid[new_y][new_x] != 0)):
-                        return False
-        return True
-    
-    def place_piece(self, piece):
-        for y, row in enumerate(piece['shape']):
-            for x, cell in enumerate(row):
-                if cell == '#':
-                    grid_x = piece['x'] + x
-                    grid_y = piece['y'] + y
-                    if grid_y >= 0:
-                        self.grid[grid_y][grid_x] = piece['type']
+        screen.blit(self.text(f"Score: {tetris.score}"), (info_x, GRID_Y_OFFSET + 120))
+        screen.blit(self.text(f"Level: {tetris.level}"), (info_x, GRID_Y_OFFSET + 150))
+        screen.blit(self.text(f"Lines: {tetris.lines_cleared}"), (info_x, GRID_Y_OFFSET + 180))
+        
+        for i, control in enumerate(CONTROLS):
+            screen.blit(self.text(control), (info_x, GRID_Y_OFFSET + 220 + i * 20))
     
-    def clear_lines(self):
-        lines_to_clear = []
-        for y in range(GRID_HEIGHT):
-            if all(cell != 0 for cell in self.grid[y]):
-                lines_to_clear.append(y)
+    def draw(self, screen, tetris):
+        screen.fill(BLACK)
+        self.draw_grid(screen, tetris)
         
-        for y in lines_to_clear:
-            del self.grid[y]
-            self.grid.insert(0, [0 for _ in range(GRID_WIDTH)])
+        if not tetris.game_over:
+            self.draw_piece(screen, tetris.current_piece)
         
-        lines_cleared = len(lines_to_clear)
-        if lines_cleared > 0:
-            self.lines_cleared += lines_cleared
-            self.score += lines_cleared * 100 * self.level
-            self.level = self.lines_cleared // 10 + 1
-            self.fall_speed = max(50, 500 - (self.level - 1) * 50)
+        self.draw_next_pieces(screen, tetris.pieces.preview())
+        self.draw_info(screen, tetris)
         
-        return lines_cleared
-    
-    def is_game_over(self):
-        return not self.is_valid_position(self.current_piece)
-    
-    def move_piece(self, dx, dy):
-        if self.is_valid_position(self.current_piece, dx, dy):
-            self.current_piece['x'] += dx
-            self.current_piece['y'] += dy
-            return True
-        return False
-    
-    def rotate_current_piece(self):
-        new_rotation, new_shape = self.rotate_piece(self.current_piece)
-        if self.is_valid_position(self.current_piece, rotation=new_rotation):
-            self.current_piece['rotation'] = new_rotation
-            self.current_piece['shape'] = new_shape
-    
-    def drop_piece(self):
-        if not self.move_piece(0, 1):
-            self.place_piece(self.current_piece)
-            self.clear_lines()
-            self.current_piece = self.next_piece
-            self.next_piece = self.get_new_piece()
-            return True
-        return False
-    
-    def hard_drop(self):
-        while self.move_piece(0, 1):
-            self.score += 1
-        self.drop_piece()
-
-def draw_grid(screen, tetris):
-    # Draw the game grid
-    for y in range(GRID_HEIGHT):
-        for x in range(GRID_WIDTH):
-            rect = pygame.Rect(
-                GRID_X_OFFSET + x * CELL_SIZE,
-                GRID_Y_OFFSET + y * CELL_SIZE,
-                CELL_SIZE,
-                CELL_SIZE
-            )
-            
-            if tetris.grid[y][x] != 0:
-                color = PIECE_COLORS[tetris.grid[y][x]]
-                pygame.draw.rect(screen, color, rect)
-                pygame.draw.rect(screen, WHITE, rect, 1)
-            else:
-                pygame.draw.rect(screen, BLACK, rect)
-                pygame.draw.rect(screen, GRAY, rect, 1)
-
-def draw_piece(screen, piece):
-    for y, row in enumerate(piece['shape']):
-        for x, cell in enumerate(row):
-            if cell == '#':
-                rect = pygame.Rect(
-                    GRID_X_OFFSET + (piece['x'] + x) * CELL_SIZE,
-                    GRID_Y_OFFSET + (piece['y'] + y) * CELL_SIZE,
-                    CELL_SIZE,
-                    CELL_SIZE
-                )
-                color = PIECE_COLORS[piece['type']]
-                pygame.draw.rect(screen, color, rect)
-                pygame.draw.rect(screen, WHITE, rect, 1)
-
-def draw_next_piece(screen, piece, font):
-    text = font.render("Next:", True, WHITE)
-    screen.blit(text, (GRID_X_OFFSET + GRID_WIDTH * CELL_SIZE + 20, GRID_Y_OFFSET))
-    
-    for y, row in enumerate(piece['shape']):
-        for x, cell in enumerate(row):
-            if cell == '#':
-                rect = pygame.Rect(
-                    GRID_X_OFFSET + GRID_WIDTH * CELL_SIZE + 20 + x * 20,
-                    GRID_Y_OFFSET + 30 + y * 20,
-                    20,
-                    20
-                )
-                color = PIECE_COLORS[piece['type']]
-                pygame.draw.rect(screen, color, rect)
-                pygame.draw.rect(screen, WHITE, rect, 1)
+        if tetris.game_over:
+            screen.blit(self.text("GAME OVER", RED), (GRID_X_OFFSET + 50, GRID_Y_OFFSET + 200))
+            screen.blit(self.text("Press R to restart"), (GRID_X_OFFSET + 30, GRID_Y_OFFSET + 230))
 
-def draw_info(screen, tetris, font):
-    info_x = GRID_X_OFFSET + GRID_WIDTH * CELL_SIZE + 20
-    
-    score_text = font.render(f"Score: {tetris.score}", True, WHITE)
-    screen.blit(score_text, (info_x, GRID_Y_OFFSET + 120))
-    
-    level_text = font.render(f"Level: {tetris.level}", True, WHITE)
-    screen.blit(level_text, (info_x, GRID_Y_OFFSET + 150))
-    
-    lines_text = font.render(f"Lines: {tetris.lines_cleared}", True, WHITE)
-    screen.blit(lines_text, (info_x, GRID_Y_OFFSET + 180))
-    
-    # Controls
-    controls = [
-        "Controls:",
-        "A/D - Move",
-        "S - Soft drop",
-        "W - Rotate",
-        "Space - Hard drop",
-        "R - Restart"
-    ]
-    
-    for i, control in enumerate(controls):
-        text = font.render(control, True, WHITE)
-        screen.blit(text, (info_x, GRID_Y_OFFSET + 220 + i * 20))
-
-def main():
+def main(record_path=None):
+    """Play; with record_path every game is recorded, the last one saved on exit"""
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Tetris")
     clock = pygame.time.Clock()
     font = pygame.font.Font(None, 24)
+    renderer = Renderer(font)
     
     tetris = Tetris()
+    recorder = Recorder(tetris)
     running = True
-    game_over = False
     
     while running:
         dt = clock.tick(60)
@@ -338,55 +163,41 @@ def main():
                 running = False
             
             elif event.type == pygame.KEYDOWN:
-                if game_over:
-                    if event.key == pygame.K_r:
-                        tetris = Tetris()
-                        game_over = False
-                else:
-                    if event.key == pygame.K_a:
-                        tetris.move_piece(-1, 0)
-                    elif event.key == pygame.K_d:
-                        tetris.move_piece(1, 0)
-                    elif event.key == pygame.K_s:
-                        tetris.drop_piece()
-                    elif event.key == pygame.K_w:
-                        tetris.rotate_current_piece()
-                    elif event.key == pygame.K_SPACE:
-                        tetris.hard_drop()
-                    elif event.key == pygame.K_r:
-                        tetris = Tetris()
-        
-        if not game_over:
-            # Handle automatic piece falling
-            tetris.fall_time += dt
-            if tetris.fall_time >= tetris.fall_speed:
-                tetris.drop_piece()
-                tetris.fall_time = 0
-            
-            # Check for game over
-            if tetris.is_game_over():
-                game_over = True
-        
-        # Draw everything
-        screen.fill(BLACK)
-        draw_grid(screen, tetris)
+                if event.key == pygame.K_r:
+                    tetris = Tetris()
+                    recorder = Recorder(tetris)
+                elif event.key in KEY_ACTIONS:
+                    recorder.step(KEY_ACTIONS[event.key])
         
-        if not game_over:
-            draw_piece(screen, tetris.current_piece)
-        
-        draw_next_piece(screen, tetris.next_piece, font)
-        draw_info(screen, tetris, font)
-        
-        if game_over:
-            game_over_text = font.render("GAME OVER", True, RED)
-            restart_text = font.render("Press R to restart", True, WHITE)
-            screen.blit(game_over_text, (GRID_X_OFFSET + 50, GRID_Y_OFFSET + 200))
-            screen.blit(restart_text, (GRID_X_OFFSET + 30, GRID_Y_OFFSET + 230))
+        # Handle automatic piece falling
+        recorder.step(dt=dt)
         
+        renderer.draw(screen, tetris)
         pygame.display.flip()
     
+    if record_path:
+        recorder.save(record_path)
     pygame.quit()
     sys.exit()
 
+def replay(path):
+    """Watch a recorded session at real time"""
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Tetris - replay")
+    renderer = Renderer(pygame.font.Font(None, 24))
+    
+    def on_frame(tetris):
+        pygame.event.pump()
+        renderer.draw(screen, tetris)
+        pygame.display.flip()
+    
+    replayer = Replayer(path)
+    tetris = replayer.run(realtime=True, on_frame=on_frame)
+    print("Replay matches recording" if replayer.verify(tetris) else "Replay differs from recording")
+    pygame.quit()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) == 3 and sys.argv[1] == "--replay":
+        replay(sys.argv[2])
+    else:
+        main(sys.argv[2] if len(sys.argv) == 3 and sys.argv[1] == "--record" else None)
\ No newline at end of file
@@ -1,17 +1,27 @@
 # tic_tac_toe_ai.py - Pygame Player vs AI game
 import pygame
 import random
+import threading
 import time
+import tic_tac_toe_solver
+from tic_tac_toe_engine import MNKEngine
+
+# Board configurations: (name, board size, marks in a row to win)
+BOARD_CONFIGS = [
+    ('3x3', 3, 3),
+    ('4x4', 4, 4),
+    ('5x5', 5, 4),
+    ('Gomoku', 15, 5),
+]
 
 class TicTacToeAI:
-    def __init__(self):
+    def __init__(self, board_config=0):
         pygame.init()
         
         # Game settings
         self.WINDOW_SIZE = 600
-        self.GRID_SIZE = 3
-        self.CELL_SIZE = self.WINDOW_SIZE // self.GRID_SIZE
         self.LINE_WIDTH = 5
+        self.set_board_config(board_config)
         
         # Colors
         self.WHITE = (255, 255, 255)
@@ -24,7 +34,6 @@ class TicTacToeAI:
         self.YELLOW = (255, 255, 0)
         
         # Game state
-        self.board = [['' for _ in range(3)] for _ in range(3)]
         self.human_player = 'X'
         self.ai_player = 'O'
         self.current_player = 'X'
@@ -50,6 +59,24 @@ class TicTacToeAI:
         # AI thinking timer
         self.ai_think_start = 0
         self.ai_think_duration = 1.0  # seconds
+        self.ai_time_limit = 2.0  # seconds of search on boards bigger than 3x3
+        
+        # Background search, started as soon as the human moves
+        self.ai_thread = None
+        self.ai_result = None
+    
+    def set_board_config(self, index):
+        """Switch to one of BOARD_CONFIGS and clear the board"""
+        self.board_config = index
+        self.board_name, self.GRID_SIZE, self.win_length = BOARD_CONFIGS[index]
+        self.CELL_SIZE = self.WINDOW_SIZE // self.GRID_SIZE
+        self.MARK_WIDTH = max(2, self.CELL_SIZE // 25)
+        self.engine = MNKEngine(self.GRID_SIZE, self.GRID_SIZE, self.win_length)
+        self.board = [['' for _ in range(self.GRID_SIZE)] for _ in range(self.GRID_SIZE)]
+    
+    def is_classic(self):
+        """Plain 3x3 Tic Tac Toe, which has a perfect-play table"""
+        return (self.GRID_SIZE, self.win_length) == (3, 3)
     
     def draw_grid(self):
         """Draw the game grid"""
@@ -70,8 +97,8 @@ class TicTacToeAI:
     
     def draw_marks(self):
         """Draw X's and O's on the board"""
-        for row in range(3):
-            for col in range(3):
+        for row in range(self.GRID_SIZE):
+            for col in range(self.GRID_SIZE):
                 if self.board[row][col] == 'X':
                     self.draw_x(row, col)
                 elif self.board[row][col] == 'O':
@@ -86,10 +113,10 @@ class TicTacToeAI:
         # Draw two lines for X
         pygame.draw.line(self.screen, self.BLUE,
                         (center_x - offset, center_y - offset),
-                        (center_x + offset, center_y + offset), 8)
+                        (center_x + offset, center_y + offset), self.MARK_WIDTH)
         pygame.draw.line(self.screen, self.BLUE,
                         (center_x + offset, center_y - offset),
-                        (center_x - offset, center_y + offset), 8)
+                        (center_x - offset, center_y + offset), self.MARK_WIDTH)
     
     def draw_o(self, row, col):
         """Draw an O in the specified cell"""
@@ -97,7 +124,7 @@ class TicTacToeAI:
         center_y = row * self.CELL_SIZE + self.CELL_SIZE // 2
         radius = self.CELL_SIZE // 3
         
-        pygame.draw.circle(self.screen, self.RED, (center_x, center_y), radius, 8)
+        pygame.draw.circle(self.screen, self.RED, (center_x, center_y), radius, self.MARK_WIDTH)
     
     def draw_difficulty_menu(self):
         """Draw the difficulty selection menu"""
@@ -112,7 +139,7 @@ class TicTacToeAI:
         # Difficulty options
         options = [
             ("1. Easy 😊", "Random moves", self.GREEN),
-            ("2. Medium 😐", "Mixed strategy", self.YELLOW),
+            ("2. Medium 😐", "Wins and blocks", self.YELLOW),
             ("3. Hard 😈", "Unbeatable AI", self.RED)
         ]
         
@@ -132,6 +159,12 @@ class TicTacToeAI:
             desc_rect = desc_surface.get_rect(center=(rect.centerx, rect.centery + 15))
             self.screen.blit(desc_surface, desc_rect)
         
+        # Board size
+        board_text = f"Board: {self.board_name} ({self.win_length} in a row) - press S to change"
+        board_surface = self.font_tiny.render(board_text, True, self.BLACK)
+        board_rect = board_surface.get_rect(center=(self.WINDOW_SIZE // 2, 515))
+        self.screen.blit(board_surface, board_rect)
+        
         # Instructions
         instruction_text = "Click on a difficulty or press 1, 2, or 3"
         instruction_surface = self.font_small.render(instruction_text, True, self.GRAY)
@@ -145,7 +178,7 @@ class TicTacToeAI:
                         (0, self.WINDOW_SIZE, self.WINDOW_SIZE, 150))
         
         # Show difficulty
-        diff_text = f"Difficulty: {self.difficulty.upper()}"
+        diff_text = f"Difficulty: {self.difficulty.upper()} | Board: {self.board_name}"
         diff_surface = self.font_small.render(diff_text, True, self.BLACK)
         diff_rect = diff_surface.get_rect(topleft=(10, self.WINDOW_SIZE + 10))
         self.screen.blit(diff_surface, diff_rect)
@@ -207,7 +240,7 @@ class TicTacToeAI:
     
     def is_valid_move(self, row, col):
         """Check if the move is valid"""
-        return 0 <= row < 3 and 0 <= col < 3 and self.board[row][col] == ''
+        return 0 <= row < self.GRID_SIZE and 0 <= col < self.GRID_SIZE and self.board[row][col] == ''
     
     def make_move(self, row, col, player):
         """Make a move on the board"""
@@ -218,22 +251,9 @@ class TicTacToeAI:
     
     def check_winner(self):
         """Check for a winner"""
-        # Check rows
-        for row in self.board:
-            if row[0] == row[1] == row[2] != '':
-                return row[0]
-        
-        # Check columns
-        for col in range(3):
-            if self.board[0][col] == self.board[1][col] == self.board[2][col] != '':
-                return self.board[0][col]
-        
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] != '':
-            return self.board[0][0]
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] != '':
-            return self.board[0][2]
-        
+        for player in (self.human_player, self.ai_player):
+            if self.engine.is_win(self.engine.bits_from_board(self.board, player)):
+                return player
         return None
     
     def is_board_full(self):
@@ -247,60 +267,12 @@ class TicTacToeAI:
     def get_available_moves(self):
         """Get list of available moves"""
         moves = []
-        for row in range(3):
-            for col in range(3):
+        for row in range(self.GRID_SIZE):
+            for col in range(self.GRID_SIZE):
                 if self.board[row][col] == '':
                     moves.append((row, col))
         return moves
     
-    def minimax(self, board, depth, is_maximizing):
-        """Minimax algorithm for AI decision making"""
-        # Create temporary board for evaluation
-        temp_board = [row[:] for row in self.board]
-        self.board = board
-        
-        winner = self.check_winner()
-        
-        # Restore board
-        self.board = temp_board
-        
-        # Terminal states
-        if winner == self.ai_player:
-            return 10 - depth
-        elif winner == self.human_player:
-            return depth - 10
-        elif self.is_board_full_temp(board):
-            return 0
-        
-        if is_maximizing:
-            max_eval = float('-inf')
-            for row in range(3):
-                for col in range(3):
-                    if board[row][col] == '':
-                        board[row][col] = self.ai_player
-                        eval_score = self.minimax(board, depth + 1, False)
-                        board[row][col] = ''
-                        max_eval = max(max_eval, eval_score)
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for row in range(3):
-                for col in range(3):
-                    if board[row][col] == '':
-                        board[row][col] = self.human_player
-                        eval_score = self.minimax(board, depth + 1, True)
-                        board[row][col] = ''
-                        min_eval = min(min_eval, eval_score)
-            return min_eval
-    
-    def is_board_full_temp(self, board):
-        """Check if temporary board is full"""
-        for row in board:
-            for cell in row:
-                if cell == '':
-                    return False
-        return True
-    
     def get_ai_move(self):
         """Get AI move based on difficulty"""
         available_moves = self.get_available_moves()
@@ -311,36 +283,57 @@ class TicTacToeAI:
         if self.difficulty == 'easy':
             return random.choice(available_moves)
         elif self.difficulty == 'medium':
-            # 70% optimal, 30% random
-            if random.random() < 0.7:
-                return self.get_best_move()
-            else:
-                return random.choice(available_moves)
+            return self.get_medium_move()
         else:  # hard
             return self.get_best_move()
     
-    def get_best_move(self):
-        """Get the best move using minimax"""
-        best_move = None
-        best_value = float('-inf')
-        
-        temp_board = [row[:] for row in self.board]
-        
-        for row, col in self.get_available_moves():
-            temp_board[row][col] = self.ai_player
-            move_value = self.minimax(temp_board, 0, False)
-            temp_board[row][col] = ''
-            
-            if move_value > best_value:
-                best_value = move_value
-                best_move = (row, col)
-        
-        return best_move
+    def get_best_move(self, max_depth=None):
+        """Get the best move from the perfect-play table, or the engine on bigger boards"""
+        if self.is_classic():
+            return tic_tac_toe_solver.best_move(self.board)
+        
+        me = self.engine.bits_from_board(self.board, self.ai_player)
+        opp = self.engine.bits_from_board(self.board, self.human_player)
+        _, cell = self.engine.search(me, opp, max_depth, self.ai_time_limit)
+        return None if cell is None else divmod(cell, self.GRID_SIZE)
+    
+    def get_medium_move(self):
+        """Take a win, never allow an immediate loss, otherwise play randomly"""
+        if not self.is_classic():
+            # A two-ply search sees the same wins and blocks
+            return self.get_best_move(max_depth=2)
+        
+        scores = tic_tac_toe_solver.move_scores(self.board)
+        empties = len(scores)
+        
+        # A move that wins now scores `empties`; one the opponent wins against next turn scores -(empties - 1)
+        winning = [move for move, score in scores if score == empties]
+        if winning:
+            return random.choice(winning)
+        safe = [move for move, score in scores if score != -(empties - 1)]
+        return random.choice(safe or [move for move, _ in scores])
     
     def start_ai_thinking(self):
-        """Start AI thinking animation"""
+        """Start AI thinking animation and the search behind it"""
         self.ai_thinking = True
         self.ai_think_start = time.time()
+        self.ai_result = None
+        self.engine.stop_event = threading.Event()
+        self.ai_thread = threading.Thread(target=self.run_ai_search, daemon=True)
+        self.ai_thread.start()
+    
+    def run_ai_search(self):
+        """Worker thread: the board is not touched until the result is collected"""
+        self.ai_result = self.get_ai_move()
+    
+    def cancel_ai_thinking(self):
+        """Stop a running search and discard its result"""
+        if self.ai_thread is not None:
+            self.engine.stop_event.set()
+            self.ai_thread.join()
+            self.ai_thread = None
+        self.ai_result = None
+        self.ai_thinking = False
     
     def handle_difficulty_click(self, pos):
         """Handle clicks in difficulty menu"""
@@ -382,11 +375,13 @@ class TicTacToeAI:
     
     def update_ai(self):
         """Update AI logic"""
-        if (self.ai_thinking and 
+        # The thinking delay runs alongside the search; move once both are over
+        if (self.ai_thinking and not self.ai_thread.is_alive() and
             time.time() - self.ai_think_start >= self.ai_think_duration):
             
             self.ai_thinking = False
-            ai_move = self.get_ai_move()
+            self.ai_thread = None
+            ai_move = self.ai_result
             
             if ai_move:
                 row, col = ai_move
@@ -401,7 +396,9 @@ class TicTacToeAI:
     
     def reset_game(self):
         """Reset the game state"""
-        self.board = [['' for _ in range(3)] for _ in range(3)]
+        self.cancel_ai_thinking()
+        self.engine.new_game()
+        self.board = [['' for _ in range(self.GRID_SIZE)] for _ in range(self.GRID_SIZE)]
         self.current_player = self.human_player
         self.game_over = False
         self.winner = None
@@ -412,30 +409,17 @@ class TicTacToeAI:
         if not self.winner:
             return
         
-        # Find winning combination and draw line
-        # Check rows
-        for i, row in enumerate(self.board):
-            if row[0] == row[1] == row[2] == self.winner:
-                start_y = i * self.CELL_SIZE + self.CELL_SIZE // 2
-                pygame.draw.line(self.screen, self.GREEN,
-                               (20, start_y), (self.WINDOW_SIZE - 20, start_y), 10)
-                return
-        
-        # Check columns
-        for j in range(3):
-            if self.board[0][j] == self.board[1][j] == self.board[2][j] == self.winner:
-                start_x = j * self.CELL_SIZE + self.CELL_SIZE // 2
-                pygame.draw.line(self.screen, self.GREEN,
-                               (start_x, 20), (start_x, self.WINDOW_SIZE - 20), 10)
-                return
+        # Find winning combination and draw line through its end cells
+        cells = self.engine.winning_cells(self.engine.bits_from_board(self.board, self.winner))
+        if not cells:
+            return
         
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] == self.winner:
-            pygame.draw.line(self.screen, self.GREEN,
-                           (20, 20), (self.WINDOW_SIZE - 20, self.WINDOW_SIZE - 20), 10)
-        elif self.board[0][2] == self.board[1][1] == self.board[2][0] == self.winner:
-            pygame.draw.line(self.screen, self.GREEN,
-                           (self.WINDOW_SIZE - 20, 20), (20, self.WINDOW_SIZE - 20), 10)
+        (start_row, start_col), (end_row, end_col) = divmod(cells[0], self.GRID_SIZE), divmod(cells[-1], self.GRID_SIZE)
+        half = self.CELL_SIZE // 2
+        pygame.draw.line(self.screen, self.GREEN,
+                       (start_col * self.CELL_SIZE + half, start_row * self.CELL_SIZE + half),
+                       (end_col * self.CELL_SIZE + half, end_row * self.CELL_SIZE + half),
+                       max(4, self.MARK_WIDTH + 2))
     
     def play(self):
         """Main game loop"""
@@ -457,7 +441,9 @@ class TicTacToeAI:
                         self.show_difficulty_menu = True
                         self.reset_game()
                     elif self.show_difficulty_menu:
-                        if event.key == pygame.K_1:
+                        if event.key == pygame.K_s:  # Cycle board size
+                            self.set_board_config((self.board_config + 1) % len(BOARD_CONFIGS))
+                        elif event.key == pygame.K_1:
                             self.difficulty = 'easy'
                             self.show_difficulty_menu = False
                         elif event.key == pygame.K_2:
@@ -484,6 +470,7 @@ class TicTacToeAI:
             pygame.display.flip()
             self.clock.tick(60)
         
+        self.cancel_ai_thinking()
         pygame.quit()
 
 # Test the game directly if run as main
@@ -0,0 +1,266 @@
+# tic_tac_toe_engine.py - Bitboard m,n,k-game engine (Tic Tac Toe, 4x4, 5x5, Gomoku)
+import random
+import time
+
+WIN_SCORE = 1000000
+TT_LIMIT = 1000000  # Transposition table entries kept before it is cleared
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class MNKEngine:
+    """k-in-a-row on a rows x cols board.
+
+    A position is two ints, one bit per cell (cell = row * cols + col) for each
+    player. Every k-cell window is precomputed as a mask, so win checks and the
+    threat evaluation are a handful of ANDs.
+    """
+
+    def __init__(self, rows, cols, k):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.full = (1 << self.cells) - 1
+
+        # Every window of k cells in a row, column or diagonal
+        self.windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        mask = 0
+                        for i in range(k):
+                            mask |= 1 << ((row + dr * i) * cols + col + dc * i)
+                        self.windows.append(mask)
+        self.cell_windows = [[w for w in self.windows if w >> cell & 1] for cell in range(self.cells)]
+
+        # Candidate moves on big boards: empty cells within two of a stone
+        reach = 1 if self.cells <= 25 else 2
+        self.neighbours = []
+        for cell in range(self.cells):
+            row, col = divmod(cell, cols)
+            mask = 0
+            for r in range(max(0, row - reach), min(rows, row + reach + 1)):
+                for c in range(max(0, col - reach), min(cols, col + reach + 1)):
+                    mask |= 1 << (r * cols + c)
+            self.neighbours.append(mask)
+
+        # Centre-first static move order
+        centre_row, centre_col = (rows - 1) / 2, (cols - 1) / 2
+        self.order = sorted(range(self.cells),
+                            key=lambda cell: abs(cell // cols - centre_row) + abs(cell % cols - centre_col))
+
+        # Board symmetries as cell permutations, with one Zobrist table per symmetry
+        self.symmetries = [[self._transform(s, cell) for cell in range(self.cells)]
+                           for s in range(8 if rows == cols else 4)]
+        self.inverse = [[0] * self.cells for _ in self.symmetries]
+        for s, mapping in enumerate(self.symmetries):
+            for cell, image in enumerate(mapping):
+                self.inverse[s][image] = cell
+        rng = random.Random(rows * 10000 + cols * 100 + k)
+        zobrist = [[rng.getrandbits(64) for _ in range(self.cells)] for _ in range(2)]
+        # keys[player][cell] holds that stone's key in every symmetric frame
+        self.keys = [[tuple(zobrist[player][mapping[cell]] for mapping in self.symmetries)
+                      for cell in range(self.cells)] for player in range(2)]
+
+        self.tt = {}
+        self.nodes = 0
+        self.deadline = None
+        self.stop_event = None
+        self.depth_reached = 0
+
+    def _transform(self, s, cell):
+        """Image of cell under symmetry s (rotations and reflections)"""
+        row, col = divmod(cell, self.cols)
+        last_row, last_col = self.rows - 1, self.cols - 1
+        images = [(row, col), (row, last_col - col), (last_row - row, col), (last_row - row, last_col - col),
+                  (col, last_row - row), (last_col - col, row), (col, row), (last_col - col, last_row - row)]
+        row, col = images[s]
+        return row * self.cols + col
+
+    # --- Board helpers ---
+
+    def bits_from_board(self, board, mark):
+        """Bitmask of mark's cells on a list-of-lists board"""
+        bits = 0
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if board[row][col] == mark:
+                    bits |= 1 << (row * self.cols + col)
+        return bits
+
+    def is_win(self, bits):
+        return any(bits & w == w for w in self.windows)
+
+    def winning_cells(self, bits):
+        """Cells of a completed line in bits, or None"""
+        for w in self.windows:
+            if bits & w == w:
+                return [cell for cell in range(self.cells) if w >> cell & 1]
+        return None
+
+    def wins_at(self, bits, cell):
+        """Would a stone at cell complete a line for bits?"""
+        bits |= 1 << cell
+        return any(bits & w == w for w in self.cell_windows[cell])
+
+    def evaluate(self, me, opp):
+        """Threat score for the side to move: open windows weighted by stones in them"""
+        score = 0
+        for w in self.windows:
+            mine = me & w
+            theirs = opp & w
+            if mine:
+                if not theirs:
+                    score += 1 << (3 * mine.bit_count())
+            elif theirs:
+                score -= 1 << (3 * theirs.bit_count())
+        return score
+
+    def candidates(self, me, opp):
+        occupied = me | opp
+        if not occupied:
+            return [self.order[0]]
+        if self.cells <= 25:
+            near = self.full
+        else:
+            near = 0
+            bits = occupied
+            while bits:
+                low = bits & -bits
+                near |= self.neighbours[low.bit_length() - 1]
+                bits ^= low
+        free = near & ~occupied
+        return [cell for cell in self.order if free >> cell & 1]
+
+    def _hashes(self, me, opp, me_player):
+        hashes = [0] * len(self.symmetries)
+        for player, bits in ((me_player, me), (1 - me_player, opp)):
+            for cell in range(self.cells):
+                if bits >> cell & 1:
+                    for s, key in enumerate(self.keys[player][cell]):
+                        hashes[s] ^= key
+        return hashes
+
+    # --- Search ---
+
+    def new_game(self):
+        """Forget positions searched in earlier games"""
+        self.tt.clear()
+
+    def _score_to_tt(self, score, ply):
+        """Win and loss scores are stored as plies from this node, not from the root"""
+        if score >= WIN_SCORE - self.cells:
+            return score + ply
+        if score <= -WIN_SCORE + self.cells:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, ply):
+        if score >= WIN_SCORE - self.cells:
+            return score - ply
+        if score <= -WIN_SCORE + self.cells:
+            return score + ply
+        return score
+
+    def search(self, me, opp, max_depth=None, time_limit=1.0):
+        """Iterative deepening alpha-beta for the side owning `me`.
+
+        Returns (score, cell) from the last completed depth; the transposition
+        table is shared between the 8 (or 4) symmetric versions of a position.
+        """
+        empties = self.cells - (me | opp).bit_count()
+        max_depth = empties if max_depth is None else min(max_depth, empties)
+        me_player = (me | opp).bit_count() % 2  # 0 moves first (X)
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline = time.perf_counter() + time_limit if time_limit else None
+        if len(self.tt) > TT_LIMIT:
+            self.tt.clear()
+
+        moves = self.candidates(me, opp)
+        if not moves:
+            return 0, None
+        best = (0, moves[0])
+        hashes = self._hashes(me, opp, me_player)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, cell = self._negamax(me, opp, me_player, depth, -WIN_SCORE - 1, WIN_SCORE + 1,
+                                            hashes, 0)
+            except SearchTimeout:
+                break
+            best = (score, cell)
+            self.depth_reached = depth
+            if abs(score) >= WIN_SCORE - self.cells:
+                break
+        return best
+
+    def _negamax(self, me, opp, player, depth, alpha, beta, hashes, ply):
+        """Returns (score, best cell); hashes are the position's key in each symmetric frame"""
+        self.nodes += 1
+        if self.nodes & 63 == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout()
+
+        moves = self.candidates(me, opp)
+        if not moves:
+            return 0, None
+
+        # Win now if possible; if the opponent threatens to win, only blocks matter
+        for cell in moves:
+            if self.wins_at(me, cell):
+                return WIN_SCORE - ply, cell
+        blocks = [cell for cell in moves if self.wins_at(opp, cell)]
+        if blocks:
+            moves = blocks
+
+        if depth == 0:
+            return self.evaluate(me, opp), None
+
+        key = min(hashes)
+        frame = hashes.index(key)
+        alpha_orig = alpha
+        entry = self.tt.get(key)
+        if entry is not None:
+            entry_depth, entry_score, flag, canon_cell = entry
+            entry_score = self._score_from_tt(entry_score, ply)
+            tt_cell = self.inverse[frame][canon_cell] if canon_cell is not None else None
+            if entry_depth >= depth and tt_cell is not None:
+                if flag == 0:
+                    return entry_score, tt_cell
+                if flag == 1:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score, tt_cell
+            if tt_cell in moves:
+                moves.remove(tt_cell)
+                moves.insert(0, tt_cell)
+
+        best_score, best_cell = -WIN_SCORE - 1, moves[0]
+        keys = self.keys[player]
+        for cell in moves:
+            child_hashes = [h ^ k for h, k in zip(hashes, keys[cell])]
+            score = -self._negamax(opp, me | 1 << cell, 1 - player, depth - 1, -beta, -alpha,
+                                   child_hashes, ply + 1)[0]
+            if score > best_score:
+                best_score, best_cell = score, cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = 2  # upper bound
+        elif best_score >= beta:
+            flag = 1  # lower bound
+        else:
+            flag = 0
+        self.tt[key] = (depth, self._score_to_tt(best_score, ply), flag, self.symmetries[frame][best_cell])
+        return best_score, best_cell
@@ -0,0 +1,81 @@
+# tic_tac_toe_solver.py - Perfect-play lookup table for 3x3 Tic Tac Toe
+from array import array
+
+# A board is encoded as a base-3 integer: cell r*3+c contributes digit 0 (empty), 1 (X) or 2 (O)
+DIGIT = {'': 0, 'X': 1, 'O': 2}
+POWERS = [3 ** i for i in range(9)]
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8),
+         (0, 3, 6), (1, 4, 7), (2, 5, 8),
+         (0, 4, 8), (2, 4, 6)]
+
+UNSOLVED = -128
+
+# Per position, for the side to move: value (1 + empty cells for a win, the
+# negative for a loss, 0 for a draw) and best cell (-1 when the game is over)
+_values = None
+_best = None
+
+
+def encode(board):
+    """Base-3 index of a board given as a 3x3 list of '', 'X', 'O'"""
+    index = 0
+    for row in range(3):
+        for col in range(3):
+            index += DIGIT[board[row][col]] * POWERS[row * 3 + col]
+    return index
+
+
+def _line_complete(cells, digit):
+    return any(cells[a] == cells[b] == cells[c] == digit for a, b, c in LINES)
+
+
+def _solve(cells, index, digit, empties):
+    """Fill the table below this position; digit is the side to move"""
+    if _values[index] != UNSOLVED:
+        return _values[index]
+
+    other = 3 - digit
+    if _line_complete(cells, other):
+        value, best = -(1 + empties), -1
+    elif empties == 0:
+        value, best = 0, -1
+    else:
+        value, best = UNSOLVED, -1
+        for cell in range(9):
+            if cells[cell] == 0:
+                cells[cell] = digit
+                score = -_solve(cells, index + digit * POWERS[cell], other, empties - 1)
+                cells[cell] = 0
+                if score > value:
+                    value, best = score, cell
+
+    _values[index] = value
+    _best[index] = best
+    return value
+
+
+def get_table():
+    """(values, best) arrays indexed by encode(board), built on first use"""
+    global _values, _best
+    if _values is None:
+        _values = array('b', [UNSOLVED]) * 3 ** 9
+        _best = array('b', [-1]) * 3 ** 9
+        _solve([0] * 9, 0, DIGIT['X'], 9)
+    return _values, _best
+
+
+def best_move(board):
+    """Optimal (row, col) for the side to move, or None if the game is over"""
+    _, best = get_table()
+    cell = best[encode(board)]
+    return None if cell < 0 else divmod(cell, 3)
+
+
+def move_scores(board):
+    """[((row, col), value)] for every empty cell, from the mover's point of view"""
+    values, _ = get_table()
+    index = encode(board)
+    flat = [cell for row in board for cell in row]
+    digit = DIGIT['X'] if flat.count('X') == flat.count('O') else DIGIT['O']
+    return [(divmod(cell, 3), -values[index + digit * POWERS[cell]])
+            for cell in range(9) if flat[cell] == '']
@@ -1,5 +1,13 @@
 import pygame
 import copy
+import random
+import threading
+import time
+from checkers import Game, ROWS, COLS, RED, BLACK, get_board_moves
+from endgame import EndgameDatabase, WIN, LOSS, DRAW
+
+# Solved endgames, if the database has been generated (see endgame.py)
+endgame_db = EndgameDatabase.open()
 
 # Minimax AI with alpha-beta pruning
 def minimax(position, depth, max_player, game, alpha=float('-inf'), beta=float('inf')):
@@ -10,7 +18,9 @@ def minimax(position, depth, max_player, game, alpha=float('-inf'), beta=float('
         max_eval = float('-inf')
         best_move = None
         for move in get_all_moves(position, (0, 0, 0), game):  # Black pieces
-            evaluation = minimax(move, depth - 1, False, game, alpha, beta)[0]
+            evaluation = probe_score(move, RED)
+            if evaluation is None:
+                evaluation = minimax(move, depth - 1, False, game, alpha, beta)[0]
             if evaluation > max_eval:
                 max_eval = evaluation
                 best_move = move
@@ -22,7 +32,9 @@ def minimax(position, depth, max_player, game, alpha=float('-inf'), beta=float('
         min_eval = float('inf')
         best_move = None
         for move in get_all_moves(position, (255, 0, 0), game):  # Red pieces
-            evaluation = minimax(move, depth - 1, True, game, alpha, beta)[0]
+            evaluation = probe_score(move, BLACK)
+            if evaluation is None:
+                evaluation = minimax(move, depth - 1, True, game, alpha, beta)[0]
             if evaluation < min_eval:
                 min_eval = evaluation
                 best_move = move
@@ -37,25 +49,325 @@ def evaluate(board):
     return board.black_left - board.red_left + (board.black_kings * 0.5 - board.red_kings * 0.5)
 
 
-def simulate_move(piece, move, board, game, skipped):
-    board.move(piece, move[0], move[1])
-    if skipped:
-        board.remove(skipped)
+def probe_score(board, color):
+    """Endgame database result as a minimax score (Black's view), or None"""
+    if endgame_db is None or board.winner() is not None:
+        return None
+    result = endgame_db.probe(board, color)
+    if result is None:
+        return None
+    if result == DRAW:
+        return 0
+    black_wins = (result == WIN) == (color == BLACK)
+    return 100 + evaluate(board) if black_wins else -100 + evaluate(board)
+
+
+def simulate_move(move, board):
+    board.make_move(move)
     return board
 
 
 def get_all_moves(board, color, game):
     moves = []
 
-    for row in range(8):
-        for col in range(8):
-            piece = board.get_piece(row, col)
-            if piece != 0 and piece.color == color:
-                valid_moves = game.get_valid_moves(piece)
-                for move, skipped in valid_moves.items():
-                    temp_board = copy.deepcopy(board)
-                    temp_piece = temp_board.get_piece(row, col)
-                    new_board = simulate_move(temp_piece, move, temp_board, game, skipped)
-                    moves.append(new_board)
+    for move in get_board_moves(board, color):
+        temp_board = copy.deepcopy(board)
+        moves.append(simulate_move(move, temp_board))
 
     return moves
+
+
+# --- Move-based search ---
+# Searches game.board in place with make/unmake instead of copying a board per
+# node, and returns a Move descriptor rather than a whole board.
+
+WIN_SCORE = 1000
+MAX_PLY = 100  # Scores within MAX_PLY of WIN_SCORE are wins in that many plies
+KNOWN_WIN = 500  # Won according to the endgame database, distance unknown
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Zobrist keys: one per (piece kind, playable square), plus one for black to move
+_zobrist_rng = random.Random(20240601)
+ZOBRIST = [[_zobrist_rng.getrandbits(64) for _ in range(32)] for _ in range(4)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+
+def square_index(row, col):
+    """Index of a playable (dark) square, 0-31"""
+    return row * 4 + col // 2
+
+
+def piece_kind(piece):
+    return (2 if piece.color == BLACK else 0) + piece.king
+
+
+def zobrist_hash(board, color):
+    h = ZOBRIST_BLACK_TO_MOVE if color == BLACK else 0
+    for row in range(ROWS):
+        for col in range(COLS):
+            piece = board.get_piece(row, col)
+            if piece != 0:
+                h ^= ZOBRIST[piece_kind(piece)][square_index(row, col)]
+    return h
+
+
+def move_hash_delta(board, move, undo):
+    """XOR delta for a move that has just been made on board"""
+    was_king, captured = undo
+    piece = board.get_piece(*move.landing)
+    kind = piece_kind(piece)
+    h = ZOBRIST_BLACK_TO_MOVE
+    h ^= ZOBRIST[kind - piece.king + was_king][square_index(*move.origin)]
+    h ^= ZOBRIST[kind][square_index(*move.landing)]
+    for captured_piece in captured:
+        h ^= ZOBRIST[piece_kind(captured_piece)][square_index(captured_piece.row, captured_piece.col)]
+    return h
+
+
+def score_to_tt(score, ply):
+    """Store win scores as distance from this node rather than from the root"""
+    if score >= WIN_SCORE - MAX_PLY:
+        return score + ply
+    if score <= -WIN_SCORE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """Inverse of score_to_tt for a node reached at ply"""
+    if score >= WIN_SCORE - MAX_PLY:
+        return score - ply
+    if score <= -WIN_SCORE + MAX_PLY:
+        return score + ply
+    return score
+
+
+def get_move_list(game, color):
+    """All Move descriptors for color on game.board"""
+    return get_board_moves(game.board, color)
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Search:
+    """Iterative deepening alpha-beta with a transposition table"""
+
+    def __init__(self, max_depth=8, time_limit=1.0, endgame=None):
+        self.max_depth = max_depth
+        self.endgame = endgame if endgame is not None else endgame_db
+        self.time_limit = time_limit
+        self.tt = {}
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline = None
+        self.stop_event = None
+
+    def best_move(self, game, color):
+        """Return (score, Move) for color to play on game.board.
+
+        The board is searched in place and left as it was found. Score is from
+        color's point of view; Move is None when color has no legal move.
+        """
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+        h = zobrist_hash(game.board, color)
+        best = (-WIN_SCORE, None)
+        root_moves = get_move_list(game, color)
+        if not root_moves:
+            return best
+        best = (0, root_moves[0])
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._root(game, color, depth, h, root_moves)
+            except SearchTimeout:
+                break
+            best = (score, move)
+            self.depth_reached = depth
+            # Search the best move first on the next iteration
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            # A win or loss within this depth cannot be shortened by searching deeper
+            if abs(score) >= WIN_SCORE - depth:
+                break
+        return best
+
+    def _root(self, game, color, depth, h, moves):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            undo = game.board.make_move(move)
+            try:
+                score = -self._negamax(game, opponent(color), depth - 1, -beta, -alpha,
+                                       h ^ move_hash_delta(game.board, move, undo), 1)
+            finally:
+                game.board.unmake_move(move, undo)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        self.tt[h] = (depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(self, game, color, depth, alpha, beta, h, ply):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout()
+
+        board = game.board
+        if board.winner() is not None:
+            return -WIN_SCORE + ply  # The side to move has no pieces left
+
+        if self.endgame is not None:
+            result = self.endgame.probe(board, color)
+            if result == WIN:
+                return KNOWN_WIN + endgame_progress(board, color)
+            if result == LOSS:
+                return -KNOWN_WIN - endgame_progress(board, opponent(color))
+            if result == DRAW:
+                return 0
+
+        alpha_orig = alpha
+        tt_move = None
+        entry = self.tt.get(h)
+        if entry is not None:
+            entry_depth, entry_score, flag, tt_move = entry
+            entry_score = score_from_tt(entry_score, ply)
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return entry_score
+                if flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                elif flag == UPPER:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        if depth == 0:
+            return evaluate(board) if color == BLACK else -evaluate(board)
+
+        moves = get_move_list(game, color)
+        if not moves:
+            return -WIN_SCORE + ply
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in moves:
+            undo = board.make_move(move)
+            try:
+                score = -self._negamax(game, opponent(color), depth - 1, -beta, -alpha,
+                                       h ^ move_hash_delta(board, move, undo), ply + 1)
+            finally:
+                board.unmake_move(move, undo)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt[h] = (depth, score_to_tt(best_score, ply), flag, best_move)
+        return best_score
+
+
+def endgame_progress(board, color):
+    """Tie-break between won positions: more material, pieces closer to the enemy.
+
+    The database only knows win/loss/draw, so this keeps the winning side
+    closing in instead of shuffling between equally won positions.
+    """
+    own, enemy = [], []
+    for row in range(ROWS):
+        for col in range(COLS):
+            piece = board.get_piece(row, col)
+            if piece != 0:
+                (own if piece.color == color else enemy).append((row, col))
+    distance = sum(min(max(abs(r - er), abs(c - ec)) for er, ec in enemy) for r, c in own)
+    return 10 * (len(own) - len(enemy)) - distance
+
+
+def opponent(color):
+    return RED if color == BLACK else BLACK
+
+
+def best_move(game, color=BLACK, max_depth=8, time_limit=1.0):
+    """Pick a Move for color within time_limit seconds"""
+    return Search(max_depth, time_limit).best_move(game, color)[1]
+
+
+class AIWorker:
+    """Runs a Search on a background thread so the game loop keeps drawing.
+
+    The search works on a snapshot of the board, so the live board can be drawn
+    (or reset) while it runs. cancel() stops the search at its next node check
+    and throws its result away.
+    """
+
+    def __init__(self, max_depth=20, time_limit=2.0):
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.search = None
+        self.thread = None
+        self.stop_event = None
+        self.lock = threading.Lock()
+        self.result = None
+        self.done = False
+
+    def start(self, game, color):
+        self.cancel()
+        snapshot = Game(None)
+        snapshot.board = copy.deepcopy(game.board)
+        snapshot.turn = color
+        self.search = Search(self.max_depth, self.time_limit)
+        self.stop_event = threading.Event()
+        self.search.stop_event = self.stop_event
+        self.result = None
+        self.done = False
+        self.thread = threading.Thread(target=self._run, args=(snapshot, color, self.search), daemon=True)
+        self.thread.start()
+
+    def _run(self, snapshot, color, search):
+        move = search.best_move(snapshot, color)[1]
+        with self.lock:
+            if search is self.search and not search.stop_event.is_set():
+                self.result = move
+                self.done = True
+
+    def thinking(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def depth(self):
+        """Deepest completed iteration of the running search"""
+        return self.search.depth_reached if self.search else 0
+
+    def poll(self):
+        """Return (done, move) without blocking; a finished result is handed out once"""
+        with self.lock:
+            if not self.done:
+                return False, None
+            self.done = False
+            self.search = None
+            return True, self.result
+
+    def cancel(self):
+        with self.lock:
+            if self.stop_event is not None:
+                self.stop_event.set()
+            self.search = None
+            self.result = None
+            self.done = False
+        self.thread = None
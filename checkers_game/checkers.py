@@ -1,4 +1,5 @@
 import pygame
+from collections import namedtuple
 
 # --- Constants ---
 ROWS, COLS = 8, 8
@@ -12,6 +13,97 @@ GRAY = (128, 128, 128)
 
 CROWN = pygame.image.load("checkers_game/assets/crown.png")  # Path to crown image
 
+# A move as (row, col) squares: where the piece starts, where it lands and what it jumps
+Move = namedtuple("Move", ["origin", "landing", "captured"])
+
+# --- Move tables for the 32 playable squares, built once at import ---
+# Square n is (SQUARES[n]); directions 0-1 head down the board (red men),
+# 2-3 head up (black men), kings use all four.
+SQUARES = [(row, col) for row in range(ROWS) for col in range(COLS) if (row + col) % 2 == 1]
+DIRECTIONS = [(1, -1), (1, 1), (-1, -1), (-1, 1)]
+MAN_DIRECTIONS = {RED: (0, 1), BLACK: (2, 3)}
+KING_DIRECTIONS = (0, 1, 2, 3)
+
+
+def _square_at(row, col):
+    if 0 <= row < ROWS and 0 <= col < COLS:
+        return row * 4 + col // 2
+    return None
+
+
+# NEIGHBOURS[sq][d]: square one step away, or None off the board
+NEIGHBOURS = [[_square_at(row + dr, col + dc) for dr, dc in DIRECTIONS] for row, col in SQUARES]
+# JUMPS[sq][d]: (jumped square, landing square), or None off the board
+JUMPS = [[(_square_at(row + dr, col + dc), _square_at(row + 2 * dr, col + 2 * dc))
+          if _square_at(row + 2 * dr, col + 2 * dc) is not None else None
+          for dr, dc in DIRECTIONS] for row, col in SQUARES]
+# Row a man of each colour is crowned on
+KING_ROW = {RED: ROWS - 1, BLACK: 0}
+
+
+def _piece_at(grid, sq):
+    row, col = SQUARES[sq]
+    return grid[row][col]
+
+
+def get_jumps(grid, piece):
+    """Complete jump chains for piece as Moves (iterative DFS over JUMPS)"""
+    origin = _square_at(piece.row, piece.col)
+    directions = KING_DIRECTIONS if piece.king else MAN_DIRECTIONS[piece.color]
+    moves = []
+    stack = [(origin, ())]
+    while stack:
+        sq, captured = stack.pop()
+        extended = False
+        # A man that reaches the king row is crowned and the move ends there
+        if captured and not piece.king and SQUARES[sq][0] == KING_ROW[piece.color]:
+            directions_here = ()
+        else:
+            directions_here = directions
+        for d in directions_here:
+            jump = JUMPS[sq][d]
+            if jump is None:
+                continue
+            over, land = jump
+            target = _piece_at(grid, over)
+            if target == 0 or target.color == piece.color or over in captured:
+                continue
+            if land != origin and _piece_at(grid, land) != 0:
+                continue
+            stack.append((land, captured + (over,)))
+            extended = True
+        if captured and not extended:
+            moves.append(Move(SQUARES[origin], SQUARES[sq], tuple(SQUARES[c] for c in captured)))
+    return moves
+
+
+def get_steps(grid, piece):
+    """Non-capturing one-square moves for piece"""
+    origin = _square_at(piece.row, piece.col)
+    directions = KING_DIRECTIONS if piece.king else MAN_DIRECTIONS[piece.color]
+    moves = []
+    for d in directions:
+        sq = NEIGHBOURS[origin][d]
+        if sq is not None and _piece_at(grid, sq) == 0:
+            moves.append(Move(SQUARES[origin], SQUARES[sq], ()))
+    return moves
+
+
+def get_board_moves(board, color):
+    """Every legal Move for color; if any capture exists only captures are legal"""
+    grid = board.board
+    pieces = [piece for row, col in SQUARES
+              for piece in (grid[row][col],) if piece != 0 and piece.color == color]
+    jumps = []
+    for piece in pieces:
+        jumps.extend(get_jumps(grid, piece))
+    if jumps:
+        return jumps
+    steps = []
+    for piece in pieces:
+        steps.extend(get_steps(grid, piece))
+    return steps
+
 class Piece:
     PADDING = 15
     OUTLINE = 2
@@ -82,8 +174,12 @@ class Board:
     def move(self, piece, row, col):
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
-        if row == ROWS - 1 or row == 0:
+        if (row == ROWS - 1 or row == 0) and not piece.king:
             piece.make_king()
+            if piece.color == RED:
+                self.red_kings += 1
+            else:
+                self.black_kings += 1
 
     def get_piece(self, row, col):
         return self.board[row][col]
@@ -94,8 +190,42 @@ class Board:
             if piece != 0:
                 if piece.color == RED:
                     self.red_left -= 1
+                    self.red_kings -= piece.king
                 else:
                     self.black_left -= 1
+                    self.black_kings -= piece.king
+
+    def make_move(self, move):
+        """Play a Move in place and return the undo info for unmake_move"""
+        piece = self.board[move.origin[0]][move.origin[1]]
+        was_king = piece.king
+        captured = [self.board[row][col] for row, col in move.captured]
+        self.move(piece, move.landing[0], move.landing[1])
+        self.remove(captured)
+        return was_king, captured
+
+    def unmake_move(self, move, undo):
+        """Take back a Move played with make_move"""
+        was_king, captured = undo
+        row, col = move.landing
+        piece = self.board[row][col]
+        if piece.king and not was_king:
+            piece.king = False
+            if piece.color == RED:
+                self.red_kings -= 1
+            else:
+                self.black_kings -= 1
+        self.board[row][col] = 0
+        self.board[move.origin[0]][move.origin[1]] = piece
+        piece.move(move.origin[0], move.origin[1])
+        for captured_piece in captured:
+            self.board[captured_piece.row][captured_piece.col] = captured_piece
+            if captured_piece.color == RED:
+                self.red_left += 1
+                self.red_kings += captured_piece.king
+            else:
+                self.black_left += 1
+                self.black_kings += captured_piece.king
 
     def winner(self):
         if self.red_left <= 0:
@@ -148,6 +278,11 @@ class Game:
             return False
         return True
 
+    def play_move(self, move):
+        """Apply a Move chosen by the AI and pass the turn"""
+        self.board.make_move(move)
+        self.change_turn()
+
     def change_turn(self):
         self.valid_moves = {}
         if self.turn == RED:
@@ -156,68 +291,11 @@ class Game:
             self.turn = RED
 
     def get_valid_moves(self, piece):
+        """Landing square -> list of jumped pieces, with captures mandatory"""
         moves = {}
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if piece.color == RED or piece.king:
-            moves.update(self._traverse_left(row - 1, max(row-3, -1), -1, piece.color, left))
-            moves.update(self._traverse_right(row - 1, max(row-3, -1), -1, piece.color, right))
-        if piece.color == BLACK or piece.king:
-            moves.update(self._traverse_left(row + 1, min(row+3, ROWS), 1, piece.color, left))
-            moves.update(self._traverse_right(row + 1, min(row+3, ROWS), 1, piece.color, right))
-
-        return moves
-
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0:
-                break
-
-            current = self.board.get_piece(r, left)
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last
-                if last:
-                    moves.update(self._traverse_left(r+step, stop, step, color, left-1, skipped=last))
-                    moves.update(self._traverse_right(r+step, stop, step, color, left+1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-            left -= 1
-        return moves
-
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS:
-                break
-
-            current = self.board.get_piece(r, right)
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last
-                if last:
-                    moves.update(self._traverse_left(r+step, stop, step, color, right-1, skipped=last))
-                    moves.update(self._traverse_right(r+step, stop, step, color, right+1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-            right += 1
+        for move in get_board_moves(self.board, piece.color):
+            if move.origin == (piece.row, piece.col):
+                skipped = [self.board.get_piece(row, col) for row, col in move.captured]
+                if len(skipped) >= len(moves.get(move.landing, [])):
+                    moves[move.landing] = skipped
         return moves
@@ -0,0 +1,276 @@
+"""Checkers endgame database: built offline by retrograde analysis, probed by the AI.
+
+Every position with up to max_pieces pieces is solved to win/loss/draw for the
+side to move and stored with 2 bits per position in one file, which the AI
+memory-maps. Build it once with:
+
+    python checkers_game/endgame.py [max_pieces] [workers]
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
+
+from checkers import Board, Piece, RED, BLACK, ROWS, SQUARES, KING_ROW, get_board_moves
+
+ENDGAME_PATH = "checkers_game/assets/endgame.db"
+
+# Values for the side to move; 0 is an unused index (overlapping pieces etc.)
+UNKNOWN, WIN, LOSS, DRAW = 0, 1, 2, 3
+
+MAGIC = b"CKEG"
+HEADER = struct.Struct("<4sII")
+ENTRY = struct.Struct("<4BQQ")
+MAX_GROUP = 5
+
+# Groups of a signature, in order: red men, red kings, black men, black kings
+GROUP_COLOR = (RED, RED, BLACK, BLACK)
+GROUP_KING = (False, True, False, True)
+
+# Squares a man of each colour may stand on (never its own king row)
+MAN_SQUARES = {color: [sq for sq, (row, col) in enumerate(SQUARES) if row != KING_ROW[color]]
+               for color in (RED, BLACK)}
+
+# Combination <-> rank tables for each group size
+COMBOS = [list(combinations(range(32), k)) for k in range(MAX_GROUP + 1)]
+RANKS = [{combo: i for i, combo in enumerate(combos)} for combos in COMBOS]
+
+
+def signatures(max_pieces):
+    """Material signatures with both sides on the board, in solving order.
+
+    Captures lead to fewer pieces and crowning to fewer men, so sorting by
+    (pieces, men) puts every successor slice before the slices that need it.
+    """
+    sigs = []
+    for counts in product(range(max_pieces + 1), repeat=4):
+        red, black = counts[0] + counts[1], counts[2] + counts[3]
+        if red and black and red + black <= max_pieces:
+            sigs.append(counts)
+    return sorted(sigs, key=level)
+
+
+def level(sig):
+    return sum(sig), sig[0] + sig[2]
+
+
+def slice_size(sig):
+    n = 2
+    for k in sig:
+        n *= len(COMBOS[k])
+    return n
+
+
+def position_index(groups, color):
+    """Index of a position given its four sorted square tuples"""
+    index = 0
+    for group in groups:
+        index = index * len(COMBOS[len(group)]) + RANKS[len(group)][group]
+    return index * 2 + (color == BLACK)
+
+
+def square_index(row, col):
+    return row * 4 + col // 2
+
+
+def get_value(data, index):
+    return (data[index >> 2] >> ((index & 3) * 2)) & 3
+
+
+def pack(values):
+    packed = bytearray((len(values) + 3) // 4)
+    for index, value in enumerate(values):
+        if value:
+            packed[index >> 2] |= value << ((index & 3) * 2)
+    return bytes(packed)
+
+
+def successor(groups, move):
+    """Sorted square groups after move; squares here are 0-31 indices"""
+    origin = square_index(*move.origin)
+    landing = square_index(*move.landing)
+    captured = {square_index(*square) for square in move.captured}
+    new_groups = [set(group) - captured for group in groups]
+    for g, group in enumerate(new_groups):
+        if origin in group:
+            group.discard(origin)
+            if not GROUP_KING[g] and move.landing[0] == KING_ROW[GROUP_COLOR[g]]:
+                g += 1
+            new_groups[g].add(landing)
+            break
+    return tuple(tuple(sorted(group)) for group in new_groups)
+
+
+def iter_positions(sig):
+    """Yield (index of red to move, square groups) for every legal placement"""
+    choices = [COMBOS[k] if GROUP_KING[g] else
+               list(combinations(MAN_SQUARES[GROUP_COLOR[g]], k))
+               for g, k in enumerate(sig)]
+    for groups in product(*choices):
+        squares = [sq for group in groups for sq in group]
+        if len(set(squares)) == len(squares):
+            yield position_index(groups, RED), groups
+
+
+def solve_signature(sig, solved):
+    """Solve one material slice; solved maps smaller slices to packed values"""
+    n = slice_size(sig)
+    values = bytearray(n)
+    valid = bytearray(n)
+    pending = bytearray(n)
+    edge_child = array("I")
+    edge_parent = array("I")
+    queue = deque()
+
+    board = Board.__new__(Board)
+    board.board = [[0] * 8 for _ in range(ROWS)]
+
+    for red_index, groups in iter_positions(sig):
+        pieces = []
+        for g, group in enumerate(groups):
+            for sq in group:
+                row, col = SQUARES[sq]
+                piece = Piece(row, col, GROUP_COLOR[g])
+                piece.king = GROUP_KING[g]
+                board.board[row][col] = piece
+                pieces.append(piece)
+
+        for color in (RED, BLACK):
+            index = red_index + (color == BLACK)
+            valid[index] = 1
+            children = set()
+            win = drawn = False
+            for move in get_board_moves(board, color):
+                child_groups = successor(groups, move)
+                child_sig = tuple(len(group) for group in child_groups)
+                if child_sig[0] + child_sig[1] == 0 or child_sig[2] + child_sig[3] == 0:
+                    win = True  # took the last piece
+                    break
+                child = position_index(child_groups, BLACK if color == RED else RED)
+                if child_sig == sig:
+                    children.add(child)
+                    continue
+                value = get_value(solved[child_sig], child)
+                if value == LOSS:
+                    win = True
+                    break
+                if value == DRAW:
+                    drawn = True
+            if win:
+                values[index] = WIN
+                queue.append(index)
+                continue
+            for child in children:
+                edge_child.append(child)
+                edge_parent.append(index)
+            # A drawn way out keeps the position from ever being lost
+            pending[index] = len(children) + drawn
+            if not pending[index]:
+                values[index] = LOSS
+                queue.append(index)
+
+        for piece in pieces:
+            board.board[piece.row][piece.col] = 0
+
+    # Parents of each position, compressed-row style
+    offsets = array("I", bytes(4 * (n + 1)))
+    for child in edge_child:
+        offsets[child + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    parents = array("I", bytes(4 * len(edge_parent)))
+    fill = array("I", offsets)
+    for child, parent in zip(edge_child, edge_parent):
+        parents[fill[child]] = parent
+        fill[child] += 1
+
+    while queue:
+        child = queue.popleft()
+        lost = values[child] == LOSS
+        for parent in parents[offsets[child]:offsets[child + 1]]:
+            if values[parent]:
+                continue
+            if lost:
+                values[parent] = WIN
+                queue.append(parent)
+            else:
+                pending[parent] -= 1
+                if not pending[parent]:
+                    values[parent] = LOSS
+                    queue.append(parent)
+
+    for index in range(n):
+        if valid[index] and not values[index]:
+            values[index] = DRAW
+    return sig, pack(values)
+
+
+def build_database(path=ENDGAME_PATH, max_pieces=4, workers=None):
+    """Solve every slice up to max_pieces in parallel and write the file"""
+    sigs = signatures(max_pieces)
+    solved = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for current in sorted({level(sig) for sig in sigs}):
+            batch = [sig for sig in sigs if level(sig) == current]
+            needed = {sig: data for sig, data in solved.items() if sum(sig) <= current[0]}
+            for sig, data in pool.map(solve_signature, batch, [needed] * len(batch)):
+                solved[sig] = data
+                print(f"solved {sig}: {slice_size(sig)} positions")
+
+    offset = HEADER.size + ENTRY.size * len(sigs)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, max_pieces, len(sigs)))
+        for sig in sigs:
+            f.write(ENTRY.pack(*sig, offset, slice_size(sig)))
+            offset += len(solved[sig])
+        for sig in sigs:
+            f.write(solved[sig])
+
+
+class EndgameDatabase:
+    """Read-only, memory-mapped win/loss/draw tables"""
+
+    def __init__(self, path=ENDGAME_PATH):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.max_pieces, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a checkers endgame database")
+        self.slices = {}
+        for i in range(count):
+            entry = ENTRY.unpack_from(self.data, HEADER.size + ENTRY.size * i)
+            self.slices[entry[:4]] = entry[4]
+
+    @classmethod
+    def open(cls, path=ENDGAME_PATH):
+        """The database at path, or None if it has not been generated"""
+        return cls(path) if os.path.exists(path) else None
+
+    def probe(self, board, color):
+        """WIN, LOSS or DRAW for color to move, or None if not covered"""
+        if board.red_left + board.black_left > self.max_pieces:
+            return None
+        groups = ([], [], [], [])
+        for sq, (row, col) in enumerate(SQUARES):
+            piece = board.board[row][col]
+            if piece != 0:
+                groups[(2 if piece.color == BLACK else 0) + piece.king].append(sq)
+        groups = tuple(tuple(group) for group in groups)
+        offset = self.slices.get(tuple(len(group) for group in groups))
+        if offset is None:
+            return None
+        index = position_index(groups, color)
+        return (self.data[offset + (index >> 2)] >> ((index & 3) * 2)) & 3 or None
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+if __name__ == "__main__":
+    build_database(max_pieces=int(sys.argv[1]) if len(sys.argv) > 1 else 4,
+                   workers=int(sys.argv[2]) if len(sys.argv) > 2 else None)
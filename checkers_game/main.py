@@ -1,7 +1,7 @@
 import pygame
 import sys
 from checkers import Game, SQUARE_SIZE, BLACK
-from ai import minimax
+from ai import AIWorker
 
 WIDTH, HEIGHT = 800, 800
 
@@ -39,6 +39,12 @@ def menu_screen(win):
                     run = False
     return mode
 
+def draw_thinking(win, font, depth):
+    dots = "." * (pygame.time.get_ticks() // 300 % 4)
+    text = font.render(f"AI thinking{dots}  (depth {depth})", True, (255, 215, 0))
+    pygame.draw.rect(win, (30, 30, 30), (0, 0, text.get_width() + 20, text.get_height() + 10))
+    win.blit(text, (10, 5))
+
 def main():
     pygame.init()
     WIN = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -47,6 +53,8 @@ def main():
 
     mode = menu_screen(WIN)
     game = Game(WIN)
+    ai_worker = AIWorker(max_depth=20, time_limit=2.0)
+    thinking_font = pygame.font.SysFont("comicsans", 30)
 
     run = True
     while run:
@@ -56,21 +64,34 @@ def main():
             print(f"{game.board.winner()} wins!")
             run = False
 
-        if mode == "pvai" and game.turn == BLACK:
-            value, new_board = minimax(game.board, 3, True, game)
-            game.board = new_board
-            game.change_turn()
+        if mode == "pvai" and game.turn == BLACK and run:
+            done, move = ai_worker.poll()
+            if done:
+                if move is None:
+                    print("Red wins!")
+                    run = False
+                else:
+                    game.play_move(move)
+            elif not ai_worker.thinking():
+                ai_worker.start(game, BLACK)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                ai_worker.cancel()
+                game.reset()
+            if event.type == pygame.MOUSEBUTTONDOWN and not (mode == "pvai" and game.turn == BLACK):
                 pos = pygame.mouse.get_pos()
                 row, col = get_row_col_from_mouse(pos)
                 game.select(row, col)
 
-        game.update()
+        game.board.draw(WIN)
+        if ai_worker.thinking():
+            draw_thinking(WIN, thinking_font, ai_worker.depth())
+        pygame.display.update()
 
+    ai_worker.cancel()
     pygame.quit()
     sys.exit()
 
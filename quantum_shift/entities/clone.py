@@ -3,6 +3,9 @@ import pygame
 from settings import *
 
 class Clone:
+    # Mutable state restored by the world rewind
+    REWIND_FIELDS = ('x', 'y', 'current_frame', 'playback_timer', 'finished')
+    
     def __init__(self, start_x, start_y, movement_history):
         self.start_x = start_x
         self.start_y = start_y
@@ -11,7 +14,7 @@ class Clone:
         self.width = 24
         self.height = 32
         
-        self.movement_history = movement_history[:]  # Copy history
+        self.movement_history = movement_history  # A FrameHistory snapshot, already a copy
         self.current_frame = 0
         self.playback_timer = 0
         self.frame_duration = 1.0 / 60.0  # 60 FPS playback
@@ -31,9 +34,8 @@ class Clone:
         
         if self.playback_timer >= self.frame_duration:
             # Get current frame data
-            frame_data = self.movement_history[self.current_frame]
-            self.x = frame_data['x']
-            self.y = frame_data['y']
+            self.x = self.movement_history.x[self.current_frame]
+            self.y = self.movement_history.y[self.current_frame]
             
             self.current_frame += 1
             self.playback_timer = 0
@@ -4,6 +4,11 @@ from settings import *
 import math
 
 class Guard:
+    # Mutable state restored by the world rewind
+    REWIND_FIELDS = ('x', 'y', 'state', 'target', 'current_patrol_index', 'patrol_direction',
+                     'facing_angle', 'alert_timer', 'alert_level', 'color',
+                     'path', 'path_index', 'path_goal')
+    
     def __init__(self, x, y, patrol_points=None):
         self.x = x
         self.y = y
@@ -25,24 +30,30 @@ class Guard:
         self.alert_timer = 0
         self.max_alert_time = 3.0
         
-        # Pathfinding
+        # Pathfinding: tile centres towards the target, planned by the game
         self.path = []
         self.path_index = 0
+        self.path_goal = None  # target tile the path was planned to
         
         # Visual
         self.color = RED
         self.alert_level = 0  # 0=calm, 1=suspicious, 2=alert
         
-    def update(self, dt, player, clones):
+    def update(self, dt, player, clones, spatial_hash=None):
         """Update guard AI"""
-        self.update_detection(player, clones)
+        self.update_detection(player, clones, spatial_hash)
         self.update_behavior(dt)
         self.update_movement(dt)
         self.update_visuals(dt)
     
-    def update_detection(self, player, clones):
+    def update_detection(self, player, clones, spatial_hash=None):
         """Update target detection"""
-        all_targets = [player] + clones
+        if spatial_hash is not None:
+            # Only the player and clones filed near the vision range; the hash is
+            # from the end of last frame, so allow a tile for their movement since
+            all_targets = spatial_hash.query_radius("actor", self.x, self.y, self.vision_range + TILE_SIZE)
+        else:
+            all_targets = [player] + clones
         closest_target = None
         closest_distance = float('inf')
         
@@ -135,14 +146,42 @@ class Guard:
         # Rotate to search
         self.facing_angle = (self.facing_angle + 90 * dt) % 360
     
+    def path_request(self):
+        """(start, goal) centres if the chase needs a new path, else None"""
+        if self.state != "chase" or not self.target:
+            return None
+        goal = (self.target.x + self.target.width / 2, self.target.y + self.target.height / 2)
+        if (int(goal[0] // TILE_SIZE), int(goal[1] // TILE_SIZE)) == self.path_goal:
+            return None
+        return (self.x + self.width / 2, self.y + self.height / 2), goal
+    
+    def set_path(self, path, goal):
+        """Follow a planned path of tile centres to the goal position"""
+        self.path = path
+        self.path_index = 1  # the first centre is the tile the guard is on
+        self.path_goal = (int(goal[0] // TILE_SIZE), int(goal[1] // TILE_SIZE))
+    
     def update_movement(self, dt):
         """Update guard position"""
+        if self.state != "chase" and self.path_goal is not None:
+            self.path = []
+            self.path_goal = None
+        
         if self.state == "patrol":
             target_point = self.patrol_points[self.current_patrol_index]
             self.move_towards(target_point[0], target_point[1], dt)
         elif self.state == "chase" and self.target:
             chase_speed = self.speed * 1.5  # Guards move faster when chasing
-            self.move_towards(self.target.x, self.target.y, dt, chase_speed)
+            if self.path_index < len(self.path):
+                # Walk the path tile by tile, then close in directly
+                point_x, point_y = self.path[self.path_index]
+                target_x = point_x - self.width / 2
+                target_y = point_y - self.height / 2
+                if abs(target_x - self.x) + abs(target_y - self.y) <= chase_speed * dt:
+                    self.path_index += 1
+                self.move_towards(target_x, target_y, dt, chase_speed)
+            else:
+                self.move_towards(self.target.x, self.target.y, dt, chase_speed)
     
     def move_towards(self, target_x, target_y, dt, speed=None):
         """Move towards target position"""
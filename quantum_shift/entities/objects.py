@@ -3,9 +3,13 @@ import pygame
 import random
 import math
 from settings import *
+from mechanics.collision import entities_overlap
 
 class GameObject:
     """Base class for all interactive objects"""
+    # Mutable state restored by the world rewind; subclasses add their own
+    REWIND_FIELDS = ('x', 'y', 'active', 'interactable')
+    
     def __init__(self, x, y, width, height, object_type):
         self.x = x
         self.y = y
@@ -27,7 +31,7 @@ class GameObject:
         """Check if entity can interact with this object"""
         if not self.interactable:
             return False
-        return self.get_rect().colliderect(entity.get_rect())
+        return entities_overlap(self, entity)
     
     def get_rect(self):
         """Get collision rectangle"""
@@ -39,6 +43,8 @@ class GameObject:
 
 class Rift(GameObject):
     """Space-time rift that needs to be repaired"""
+    REWIND_FIELDS = GameObject.REWIND_FIELDS + ('repaired', 'energy')
+    
     def __init__(self, x, y):
         super().__init__(x, y, 40, 40, "rift")
         self.repaired = False
@@ -134,6 +140,8 @@ class Rift(GameObject):
 
 class PressurePlate(GameObject):
     """Pressure plate activated by player or clones"""
+    REWIND_FIELDS = GameObject.REWIND_FIELDS + ('activated', 'activation_count')
+    
     def __init__(self, x, y):
         super().__init__(x, y, 48, 16, "pressure_plate")
         self.activated = False
@@ -148,7 +156,7 @@ class PressurePlate(GameObject):
     def check_activation(self, entities):
         """Check if entities are activating the plate"""
         for entity in entities:
-            if entity and self.get_rect().colliderect(entity.get_rect()):
+            if entity and entities_overlap(self, entity):
                 self.activation_count += 1
         
         self.activated = self.activation_count >= self.required_count
@@ -170,6 +178,8 @@ class PressurePlate(GameObject):
 
 class MovingPlatform(GameObject):
     """Platform that moves between waypoints"""
+    REWIND_FIELDS = GameObject.REWIND_FIELDS + ('current_waypoint', 'direction')
+    
     def __init__(self, x, y, waypoints, speed=50):
         super().__init__(x, y, 64, 16, "moving_platform")
         self.waypoints = waypoints
@@ -219,6 +229,8 @@ class MovingPlatform(GameObject):
 
 class Portal(GameObject):
     """Portal that teleports entities"""
+    REWIND_FIELDS = GameObject.REWIND_FIELDS + ('cooldown',)
+    
     def __init__(self, x, y, destination_x, destination_y):
         super().__init__(x, y, 32, 48, "portal")
         self.destination_x = destination_x
@@ -267,6 +279,8 @@ class Portal(GameObject):
 
 class TimedPlatform(GameObject):
     """Platform that disappears after being stepped on"""
+    REWIND_FIELDS = GameObject.REWIND_FIELDS + ('timer', 'triggered', 'visible')
+    
     def __init__(self, x, y, timer_duration=3.0):
         super().__init__(x, y, 48, 16, "timed_platform")
         self.timer_duration = timer_duration
@@ -3,7 +3,7 @@ import pygame
 from settings import *
 
 class Player:
-    def __init__(self, x, y, time_controller, gravity_system):
+    def __init__(self, x, y, time_controller, gravity_system, collision_system=None):
         self.x = x
         self.y = y
         self.width = 24
@@ -17,6 +17,7 @@ class Player:
         # Systems
         self.time_controller = time_controller
         self.gravity_system = gravity_system
+        self.collision_system = collision_system
         
         # Animation
         self.animation_frame = 0
@@ -62,23 +63,28 @@ class Player:
         gravity_direction = 1 if not self.gravity_system.is_flipped() else -1
         self.vel_y += GRAVITY * gravity_direction * dt
         
-        # Update position
-        self.x += self.vel_x * dt
-        self.y += self.vel_y * dt
-        
-        # Simple ground collision (you'd expand this with proper collision system)
-        ground_level = SCREEN_HEIGHT - 100 if not self.gravity_system.is_flipped() else 100
-        
-        if not self.gravity_system.is_flipped():
-            if self.y + self.height >= ground_level:
-                self.y = ground_level - self.height
-                self.vel_y = 0
-                self.on_ground = True
+        if self.collision_system is not None and self.collision_system.has_tiles():
+            # Move against the level's tiles
+            self.on_ground = self.collision_system.move_and_collide(
+                self, self.vel_x * dt, self.vel_y * dt, gravity_direction)
         else:
-            if self.y <= ground_level:
-                self.y = ground_level
-                self.vel_y = 0
-                self.on_ground = True
+            # Update position
+            self.x += self.vel_x * dt
+            self.y += self.vel_y * dt
+            
+            # No tile map: fall back to a fixed ground line
+            ground_level = SCREEN_HEIGHT - 100 if not self.gravity_system.is_flipped() else 100
+            
+            if not self.gravity_system.is_flipped():
+                if self.y + self.height >= ground_level:
+                    self.y = ground_level - self.height
+                    self.vel_y = 0
+                    self.on_ground = True
+            else:
+                if self.y <= ground_level:
+                    self.y = ground_level
+                    self.vel_y = 0
+                    self.on_ground = True
         
         # Screen boundaries
         self.x = max(0, min(self.x, SCREEN_WIDTH - self.width))
@@ -87,20 +93,12 @@ class Player:
         """Handle time rewind"""
         rewind_data = self.time_controller.get_rewind_position()
         if rewind_data:
-            self.x = rewind_data['x']
-            self.y = rewind_data['y']
-            self.vel_x = rewind_data['vel_x']
-            self.vel_y = rewind_data['vel_y']
+            self.x, self.y, self.vel_x, self.vel_y, _ = rewind_data
     
     def record_position(self):
         """Record position for time mechanics"""
-        self.time_controller.record_frame({
-            'x': self.x,
-            'y': self.y,
-            'vel_x': self.vel_x,
-            'vel_y': self.vel_y,
-            'facing_right': self.facing_right
-        })
+        self.time_controller.record_frame(self.x, self.y, self.vel_x, self.vel_y,
+                                          self.facing_right)
     
     def update_animation(self, dt):
         """Update animation"""
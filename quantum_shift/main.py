@@ -12,7 +12,11 @@ from entities.guard import Guard
 from mechanics.time_controller import TimeController
 from mechanics.gravity import GravitySystem
 from mechanics.collision import CollisionSystem
+from mechanics.spatial_hash import SpatialHash
+from mechanics.world_history import WorldHistory
 from utils.level_loader import LevelLoader
+from utils.pathfinding import Pathfinder
+from utils.hierarchical_pathfinding import HierarchicalPathfinder
 
 class Game:
     def __init__(self):
@@ -28,6 +32,11 @@ class Game:
         self.time_controller = TimeController()
         self.gravity_system = GravitySystem()
         self.collision_system = CollisionSystem()
+        self.spatial_hash = SpatialHash()
+        self.world_history = WorldHistory()
+        self.world_rewind_index = None  # frame shown while the world is rewinding
+        self.pathfinder = Pathfinder()
+        self.guard_pathfinder = HierarchicalPathfinder(self.pathfinder)
         self.level_loader = LevelLoader()
         
         # Game state
@@ -48,15 +57,23 @@ class Game:
         """Load a specific level"""
         self.level_data = self.level_loader.load_level(level_num)
         if self.level_data:
+            self.collision_system.load_tiles(self.level_data['tiles'])
+            self.pathfinder.load_tiles(self.level_data['tiles'], self.collision_system.solid_tiles)
+            self.guard_pathfinder.build()
             self.player = Player(
                 self.level_data['player_start'][0],
                 self.level_data['player_start'][1],
                 self.time_controller,
-                self.gravity_system
+                self.gravity_system,
+                self.collision_system
             )
             self.guards = [Guard(pos[0], pos[1]) for pos in self.level_data['guards']]
             self.objects = self.level_data['object_instances']
             self.clones = []
+            self.time_controller.reset()
+            self.world_history.clear()
+            self.world_rewind_index = None
+            self.update_spatial_hash()
             return True
         return False
     
@@ -77,7 +94,8 @@ class Game:
             if event.key == pygame.K_ESCAPE:
                 self.state = "menu"
             elif event.key == pygame.K_r:
-                self.time_controller.start_rewind()
+                # The world can't go back past its oldest keyframe; keep the player in step
+                self.time_controller.start_rewind(max(0, self.world_history.first_restorable()))
             elif event.key == pygame.K_c:
                 self.create_clone()
             elif event.key == pygame.K_g:
@@ -91,7 +109,8 @@ class Game:
     
     def create_clone(self):
         """Create a clone from recorded movement"""
-        if self.time_controller.can_create_clone():
+        # The rewind restores the clone list each frame, so a new clone would be lost
+        if self.time_controller.can_create_clone() and not self.time_controller.is_rewinding():
             from entities.clone import Clone
             clone = Clone(
                 self.player.x, self.player.y,
@@ -101,7 +120,8 @@ class Game:
     
     def interact_with_objects(self):
         """Handle object interactions"""
-        for obj in self.objects:
+        # The hash was built at the end of last frame; allow a tile of movement since
+        for obj in self.spatial_hash.query_entity("object", self.player, TILE_SIZE):
             if obj.can_interact_with(self.player):
                 obj.interact(self.player)
     
@@ -122,17 +142,33 @@ class Game:
         # Update entities
         if self.player:
             self.player.update(dt, pygame.key.get_pressed())
-            
-        for clone in self.clones[:]:
-            clone.update(dt)
-            if clone.is_finished():
-                self.clones.remove(clone)
         
-        for guard in self.guards:
-            guard.update(dt, self.player, self.clones)
+        if self.time_controller.is_rewinding():
+            self.rewind_world()
+        else:
+            if self.world_rewind_index is not None:
+                # Rewind released: the world carries on from the frame it reached
+                self.world_history.truncate(self.world_rewind_index)
+                self.world_rewind_index = None
+            
+            for clone in self.clones[:]:
+                clone.update(dt)
+                if clone.is_finished():
+                    self.clones.remove(clone)
+            
+            self.plan_guard_paths()
+            for guard in self.guards:
+                guard.update(dt, self.player, self.clones, self.spatial_hash)
+            
+            for obj in self.objects:
+                obj.update(dt)
+            
+            self.world_history.record((("guards", self.guards), ("objects", self.objects),
+                                       ("clones", self.clones)))
         
-        for obj in self.objects:
-            obj.update(dt)
+        # Everything has moved: refile it for this frame's queries
+        self.update_spatial_hash()
+        self.update_pressure_plates()
         
         # Check collisions
         self.check_collisions()
@@ -140,18 +176,58 @@ class Game:
         # Check win conditions
         self.check_level_complete()
     
+    def rewind_world(self):
+        """Step guards, objects and clones back in time alongside the player"""
+        if self.world_rewind_index is None:
+            self.world_rewind_index = len(self.world_history) - 1
+        else:
+            self.world_rewind_index = max(self.world_history.first_restorable(),
+                                          self.world_rewind_index - self.time_controller.rewind_speed)
+        groups = self.world_history.restore(self.world_rewind_index)
+        if groups:
+            self.guards = groups["guards"]
+            self.objects = groups["objects"]
+            self.clones = groups["clones"]
+    
+    def plan_guard_paths(self):
+        """Plan paths for every chasing guard whose target changed tile, in one batch"""
+        guards = []
+        requests = []
+        for guard in self.guards:
+            request = guard.path_request()
+            if request:
+                guards.append(guard)
+                requests.append(request)
+        if requests:
+            for guard, request, path in zip(guards, requests, self.guard_pathfinder.find_paths(requests)):
+                guard.set_path(path, request[1])
+    
+    def update_spatial_hash(self):
+        """Refile every entity in the broad phase grid"""
+        self.spatial_hash.rebuild({
+            "actor": [self.player] + self.clones,
+            "guard": self.guards,
+            "object": self.objects,
+        })
+    
+    def update_pressure_plates(self):
+        """Let the player and clones standing on plates activate them"""
+        for obj in self.objects:
+            if obj.type == "pressure_plate":
+                obj.check_activation(self.spatial_hash.query_entity("actor", obj))
+    
     def check_collisions(self):
         """Handle all collision detection"""
         if not self.player:
             return
             
         # Player-Guard collisions
-        for guard in self.guards:
+        for guard in self.spatial_hash.query_entity("guard", self.player):
             if self.collision_system.check_collision(self.player, guard):
                 self.handle_player_caught()
         
         # Player-Object collisions
-        for obj in self.objects:
+        for obj in self.spatial_hash.query_entity("object", self.player):
             if obj.type == "rift" and self.collision_system.check_collision(self.player, obj):
                 self.repair_rift(obj)
     
@@ -193,6 +269,8 @@ class Game:
             self.player.reset()
             self.clones.clear()
             self.time_controller.reset()
+            self.world_history.clear()
+            self.world_rewind_index = None
     
     def game_over(self):
         """Handle game over"""
@@ -1,16 +1,155 @@
 # quantum_shift/mechanics/collision.py
 import pygame
+import math
+from bisect import bisect_left, bisect_right
 from settings import *
 
+def entities_overlap(entity1, entity2):
+    """Same answer as entity1.get_rect().colliderect(entity2.get_rect()), without building Rects"""
+    # pygame.Rect truncates float coordinates, so do the same
+    x1, y1, w1, h1 = int(entity1.x), int(entity1.y), int(entity1.width), int(entity1.height)
+    x2, y2, w2, h2 = int(entity2.x), int(entity2.y), int(entity2.width), int(entity2.height)
+    return (w1 > 0 and h1 > 0 and w2 > 0 and h2 > 0 and
+            x1 < x2 + w2 and x2 < x1 + w1 and y1 < y2 + h2 and y2 < y1 + h1)
+
 class CollisionSystem:
     """Handles collision detection and response"""
     def __init__(self):
         self.tile_map = []
-        self.solid_tiles = set()
+        self.solid_tiles = {1, 2, 3}  # wall, platform, breakable
+        
+        # Built by load_tiles: one byte per tile, and per row the (first, last)
+        # columns of each run of solid tiles
+        self.rows = 0
+        self.cols = 0
+        self.solid = None
+        self.row_spans = []
+        self.row_span_starts = []
+        self.row_span_ends = []
+    
+    def load_tiles(self, tile_map):
+        """Precompute the solid bitmap and row spans for a level's tile map"""
+        self.tile_map = tile_map
+        self.rows = len(tile_map)
+        self.cols = max((len(row) for row in tile_map), default=0)
+        self.solid = bytearray(self.rows * self.cols)
+        self.row_spans = []
+        for y, row in enumerate(tile_map):
+            spans = []
+            start = None
+            for x, tile in enumerate(row):
+                if tile in self.solid_tiles:
+                    self.solid[y * self.cols + x] = 1
+                    if start is None:
+                        start = x
+                elif start is not None:
+                    spans.append((start, x - 1))
+                    start = None
+            if start is not None:
+                spans.append((start, len(row) - 1))
+            self.row_spans.append(spans)
+        self.row_span_starts = [[start for start, _ in spans] for spans in self.row_spans]
+        self.row_span_ends = [[end for _, end in spans] for spans in self.row_spans]
+    
+    def has_tiles(self):
+        """Check if a tile map has been loaded"""
+        return self.solid is not None
+    
+    def is_solid(self, tile_x, tile_y):
+        """Check a single tile; everything outside the map is open"""
+        if 0 <= tile_x < self.cols and 0 <= tile_y < self.rows:
+            return self.solid[tile_y * self.cols + tile_x] == 1
+        return False
+    
+    def first_solid_in_row(self, tile_y, first_col, last_col):
+        """Lowest solid column of a row within [first_col, last_col], or None"""
+        if not 0 <= tile_y < self.rows:
+            return None
+        ends = self.row_span_ends[tile_y]
+        i = bisect_left(ends, first_col)
+        if i < len(ends):
+            col = max(self.row_span_starts[tile_y][i], first_col)
+            if col <= last_col:
+                return col
+        return None
+    
+    def last_solid_in_row(self, tile_y, first_col, last_col):
+        """Highest solid column of a row within [first_col, last_col], or None"""
+        if not 0 <= tile_y < self.rows:
+            return None
+        i = bisect_right(self.row_span_starts[tile_y], last_col) - 1
+        if i >= 0:
+            col = min(self.row_span_ends[tile_y][i], last_col)
+            if col >= first_col:
+                return col
+        return None
+    
+    def move_and_collide(self, entity, dx, dy, gravity_direction=1):
+        """Move an entity by (dx, dy), stopping at solid tiles.
+        
+        Moves along x then y. Each axis only looks at the rows or columns the
+        entity's edge sweeps through, one span lookup per row, so the cost
+        depends on the entity's size and speed, not on the level. Blocked
+        velocity components are zeroed. Returns True if the entity landed on
+        the side gravity pulls towards.
+        """
+        size = TILE_SIZE
+        
+        if dx:
+            top = math.floor(entity.y / size)
+            bottom = math.ceil((entity.y + entity.height) / size) - 1
+            if dx > 0:
+                edge = math.ceil((entity.x + entity.width) / size)
+                reach = math.ceil((entity.x + entity.width + dx) / size) - 1
+                hit = None
+                for tile_y in range(top, bottom + 1):
+                    col = self.first_solid_in_row(tile_y, edge, reach)
+                    if col is not None and (hit is None or col < hit):
+                        hit = col
+                if hit is None:
+                    entity.x += dx
+                else:
+                    entity.x = hit * size - entity.width
+                    entity.vel_x = 0
+            else:
+                edge = math.floor(entity.x / size) - 1
+                reach = math.floor((entity.x + dx) / size)
+                hit = None
+                for tile_y in range(top, bottom + 1):
+                    col = self.last_solid_in_row(tile_y, reach, edge)
+                    if col is not None and (hit is None or col > hit):
+                        hit = col
+                if hit is None:
+                    entity.x += dx
+                else:
+                    entity.x = (hit + 1) * size
+                    entity.vel_x = 0
+        
+        landed = False
+        if dy:
+            left = math.floor(entity.x / size)
+            right = math.ceil((entity.x + entity.width) / size) - 1
+            if dy > 0:
+                rows = range(math.ceil((entity.y + entity.height) / size),
+                             math.ceil((entity.y + entity.height + dy) / size))
+            else:
+                rows = range(math.floor(entity.y / size) - 1, math.floor((entity.y + dy) / size) - 1, -1)
+            for tile_y in rows:
+                if self.first_solid_in_row(tile_y, left, right) is not None:
+                    if dy > 0:
+                        entity.y = tile_y * size - entity.height
+                    else:
+                        entity.y = (tile_y + 1) * size
+                    entity.vel_y = 0
+                    landed = (dy > 0) == (gravity_direction > 0)
+                    break
+            else:
+                entity.y += dy
+        return landed
         
     def check_collision(self, entity1, entity2):
         """Check collision between two entities"""
-        return entity1.get_rect().colliderect(entity2.get_rect())
+        return entities_overlap(entity1, entity2)
     
     def check_tile_collision(self, entity, tile_map):
         """Check collision with tile map"""
@@ -0,0 +1,73 @@
+# quantum_shift/mechanics/spatial_hash.py
+from settings import *
+
+class SpatialHash:
+    """Broad phase: a uniform grid of TILE_SIZE cells listing the entities in each.
+
+    Entities are filed by layer ("actor", "guard", "object") from their x, y,
+    width and height, and the whole hash is rebuilt once per frame. Queries
+    return each nearby entity once; callers still do the exact overlap or
+    distance test on what comes back.
+    """
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.layers = {}
+
+    def clear(self):
+        """Remove every entity"""
+        self.layers = {}
+
+    def insert(self, layer, entity):
+        """File an entity under every cell its bounding box touches"""
+        cells = self.layers.setdefault(layer, {})
+        size = self.cell_size
+        left = int(entity.x // size)
+        right = int((entity.x + entity.width) // size)
+        top = int(entity.y // size)
+        bottom = int((entity.y + entity.height) // size)
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket is None:
+                    cells[(cell_x, cell_y)] = [entity]
+                else:
+                    bucket.append(entity)
+
+    def rebuild(self, layers):
+        """Refill the hash from {layer: entities}"""
+        self.clear()
+        for layer, entities in layers.items():
+            self.layers[layer] = {}
+            for entity in entities:
+                if entity is not None:
+                    self.insert(layer, entity)
+
+    def query(self, layer, x, y, width, height):
+        """Entities of a layer in the cells overlapped by a rectangle"""
+        cells = self.layers.get(layer)
+        if not cells:
+            return []
+        size = self.cell_size
+        found = []
+        seen = set()
+        for cell_y in range(int(y // size), int((y + height) // size) + 1):
+            for cell_x in range(int(x // size), int((x + width) // size) + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket:
+                    for entity in bucket:
+                        if id(entity) not in seen:
+                            seen.add(id(entity))
+                            found.append(entity)
+        return found
+
+    def query_entity(self, layer, entity, margin=0):
+        """Entities of a layer near another entity's bounding box, grown by margin"""
+        return self.query(layer, entity.x - margin, entity.y - margin,
+                          entity.width + 2 * margin, entity.height + 2 * margin)
+
+    def query_radius(self, layer, x, y, radius):
+        """Entities of a layer in the cells within radius of a point"""
+        return self.query(layer, x - radius, y - radius, 2 * radius, 2 * radius)
+
+# =============================================================================
+
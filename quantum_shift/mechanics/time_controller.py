@@ -1,14 +1,81 @@
 # quantum_shift/mechanics/time_controller.py
 import pygame
-from collections import deque
+from array import array
 from settings import *
 
+class FrameHistory:
+    """Ring buffer of player frames stored as parallel array('f') columns.
+    
+    Frame 0 is the oldest. Recording a frame writes five floats into
+    preallocated columns, so nothing is allocated per frame.
+    """
+    FIELDS = ('x', 'y', 'vel_x', 'vel_y', 'facing')
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        for name in self.FIELDS:
+            setattr(self, name, array('f', bytes(4 * capacity)))
+        self.start = 0  # slot of the oldest frame
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def append(self, x, y, vel_x, vel_y, facing_right):
+        """Record a frame, overwriting the oldest when full"""
+        if self.count < self.capacity:
+            slot = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vel_x[slot] = vel_x
+        self.vel_y[slot] = vel_y
+        self.facing[slot] = 1.0 if facing_right else 0.0
+    
+    def slot(self, index):
+        """Column position of the index-th oldest frame"""
+        return (self.start + index) % self.capacity
+    
+    def frame(self, index):
+        """(x, y, vel_x, vel_y, facing_right) of the index-th oldest frame"""
+        slot = (self.start + index) % self.capacity
+        return (self.x[slot], self.y[slot], self.vel_x[slot], self.vel_y[slot],
+                self.facing[slot] > 0.5)
+    
+    def clear(self):
+        """Forget every frame"""
+        self.start = 0
+        self.count = 0
+    
+    def truncate(self, index):
+        """Drop every frame after index, so recording carries on from there"""
+        self.count = max(0, min(self.count, index + 1))
+    
+    def snapshot(self):
+        """Frames oldest first in a new FrameHistory whose columns are array slices"""
+        copy = FrameHistory(0)
+        end = self.start + self.count
+        for name in self.FIELDS:
+            column = getattr(self, name)
+            if end <= self.capacity:
+                setattr(copy, name, column[self.start:end])
+            else:
+                setattr(copy, name, column[self.start:] + column[:end - self.capacity])
+        copy.capacity = copy.count = self.count
+        return copy
+
 class TimeController:
     """Handles all time-based mechanics"""
-    def __init__(self):
-        self.frame_history = deque(maxlen=int(TIME_REWIND_DURATION * FPS))
+    def __init__(self, rewind_duration=TIME_REWIND_DURATION):
+        self.frame_history = FrameHistory(int(rewind_duration * FPS))
         self.is_rewinding_time = False
         self.rewind_index = 0
+        self.rewound_to = 0  # frame last shown by the rewind
+        self.rewind_floor = 0  # oldest frame the rewind may reach
+        self.rewind_speed = 2  # frames stepped back per update
         self.energy = ENERGY_MAX
         
     def update(self, dt):
@@ -17,20 +84,24 @@ class TimeController:
         if self.energy < ENERGY_MAX and not self.is_rewinding_time:
             self.energy = min(ENERGY_MAX, self.energy + 30 * dt)
     
-    def record_frame(self, frame_data):
+    def record_frame(self, x, y, vel_x, vel_y, facing_right):
         """Record a frame of movement data"""
         if not self.is_rewinding_time:
-            self.frame_history.append(frame_data.copy())
+            self.frame_history.append(x, y, vel_x, vel_y, facing_right)
     
-    def start_rewind(self):
-        """Start time rewind"""
-        if self.energy >= ENERGY_REWIND_COST and len(self.frame_history) > 0:
+    def start_rewind(self, oldest_frame=0):
+        """Start time rewind, going back no further than oldest_frame"""
+        if self.energy >= ENERGY_REWIND_COST and len(self.frame_history) > oldest_frame:
             self.is_rewinding_time = True
+            self.rewind_floor = oldest_frame
             self.rewind_index = len(self.frame_history) - 1
+            self.rewound_to = self.rewind_index
             self.energy -= ENERGY_REWIND_COST
     
     def stop_rewind(self):
-        """Stop time rewind"""
+        """Stop time rewind; the frames after the one reached are abandoned"""
+        if self.is_rewinding_time:
+            self.frame_history.truncate(self.rewound_to)
         self.is_rewinding_time = False
         self.rewind_index = 0
     
@@ -39,10 +110,11 @@ class TimeController:
         return self.is_rewinding_time
     
     def get_rewind_position(self):
-        """Get position data during rewind"""
+        """Get (x, y, vel_x, vel_y, facing_right) during rewind"""
         if self.is_rewinding_time and self.rewind_index >= 0:
-            frame_data = self.frame_history[self.rewind_index]
-            self.rewind_index = max(0, self.rewind_index - 2)  # Rewind speed
+            frame_data = self.frame_history.frame(self.rewind_index)
+            self.rewound_to = self.rewind_index
+            self.rewind_index = max(self.rewind_floor, self.rewind_index - self.rewind_speed)
             return frame_data
         else:
             self.stop_rewind()
@@ -57,14 +129,15 @@ class TimeController:
         """Get movement history for clone creation"""
         if self.can_create_clone():
             self.energy -= ENERGY_CLONE_COST
-            return list(self.frame_history)
-        return []
+            return self.frame_history.snapshot()
+        return FrameHistory(0)
     
     def reset(self):
         """Reset time controller"""
         self.frame_history.clear()
         self.is_rewinding_time = False
         self.rewind_index = 0
+        self.rewound_to = 0
         self.energy = ENERGY_MAX
     
     def get_energy_percentage(self):
@@ -0,0 +1,175 @@
+# quantum_shift/mechanics/world_history.py
+import sys
+import time
+from array import array
+from settings import *
+
+class WorldHistory:
+    """Rewindable record of every guard, object and clone.
+    
+    Each frame is stored in a ring buffer of TIME_REWIND_DURATION * FPS slots
+    as (layout, indices, values). The layout names the entities in each group,
+    and every entity lists its mutable attributes in REWIND_FIELDS. A keyframe
+    (indices None) holds every field value. Frames in between hold only the
+    positions and new values of fields that changed since the previous frame.
+    A keyframe is written every keyframe_interval frames, and whenever an
+    entity is added or removed. Restoring a frame replays at most
+    keyframe_interval - 1 deltas on top of its keyframe.
+    """
+    def __init__(self, duration=TIME_REWIND_DURATION, keyframe_interval=30):
+        self.capacity = int(duration * FPS)
+        self.keyframe_interval = keyframe_interval
+        self.frames = [None] * self.capacity
+        self.start = 0  # slot of the oldest frame
+        self.count = 0
+        self.layout = None
+        self.last_values = None
+        self.since_keyframe = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        """Forget every frame"""
+        self.frames = [None] * self.capacity
+        self.start = 0
+        self.count = 0
+        self.layout = None
+        self.last_values = None
+        self.since_keyframe = 0
+    
+    def record(self, groups):
+        """Record the current state of groups, a sequence of (name, entities)"""
+        layout = tuple((name, tuple(entities)) for name, entities in groups)
+        values = [getattr(entity, field)
+                  for _, entities in layout for entity in entities for field in entity.REWIND_FIELDS]
+        
+        if layout != self.layout or self.since_keyframe >= self.keyframe_interval - 1:
+            frame = (layout, None, tuple(values))
+            self.since_keyframe = 0
+        else:
+            layout = self.layout  # share one layout tuple between frames
+            last = self.last_values
+            changed = [i for i, value in enumerate(values) if value != last[i]]
+            frame = (layout, array('I', changed), tuple([values[i] for i in changed]))
+            self.since_keyframe += 1
+        self.layout = layout
+        self.last_values = values
+        
+        if self.count < self.capacity:
+            self.frames[(self.start + self.count) % self.capacity] = frame
+            self.count += 1
+        else:
+            self.frames[self.start] = frame
+            self.start = (self.start + 1) % self.capacity
+    
+    def _frame(self, index):
+        return self.frames[(self.start + index) % self.capacity]
+    
+    def first_restorable(self):
+        """Index of the oldest frame that still has its keyframe, or -1 if none"""
+        for index in range(min(self.count, self.keyframe_interval)):
+            if self._frame(index)[1] is None:
+                return index
+        return -1
+    
+    def restore(self, index):
+        """Put every recorded entity back as it was at frame index (0 = oldest).
+        
+        Frames older than the oldest keyframe are clamped to it. Returns
+        {name: entities} as they were, or None if nothing can be restored.
+        """
+        index = min(max(index, self.first_restorable()), self.count - 1)
+        if index < 0:
+            return None
+        keyframe = index
+        while self._frame(keyframe)[1] is not None:
+            keyframe -= 1
+        layout, _, values = self._frame(keyframe)
+        values = list(values)
+        for delta in range(keyframe + 1, index + 1):
+            _, changed, new_values = self._frame(delta)
+            for i, value in zip(changed, new_values):
+                values[i] = value
+        
+        position = 0
+        for _, entities in layout:
+            for entity in entities:
+                for field in entity.REWIND_FIELDS:
+                    setattr(entity, field, values[position])
+                    position += 1
+        return {name: list(entities) for name, entities in layout}
+    
+    def truncate(self, index):
+        """Drop every frame after index, so recording carries on from there"""
+        for dropped in range(index + 1, self.count):
+            self.frames[(self.start + dropped) % self.capacity] = None
+        self.count = max(0, index + 1)
+        # The live state now matches frame index, not the last recorded frame
+        self.layout = None
+        self.last_values = None
+    
+    def memory_usage(self):
+        """Approximate bytes held by the recorded frames"""
+        total = sys.getsizeof(self.frames)
+        layouts = set()
+        for index in range(self.count):
+            layout, changed, values = self._frame(index)
+            total += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values
+                                                 if isinstance(value, float))
+            if changed is not None:
+                total += sys.getsizeof(changed)
+            if id(layout) not in layouts:
+                layouts.add(id(layout))
+                total += sys.getsizeof(layout) + sum(sys.getsizeof(entities) for _, entities in layout)
+        return total
+
+def benchmark(guard_counts=(10, 50, 200), object_count=100, seconds=TIME_REWIND_DURATION,
+              intervals=(1, 10, 30, 60)):
+    """Memory per recorded second and restore cost for synthetic worlds.
+    
+    Run from the quantum_shift directory:  python -m mechanics.world_history
+    """
+    import random
+    from entities.guard import Guard
+    from entities.objects import create_object
+    
+    frames = int(seconds * FPS)
+    dt = 1.0 / FPS
+    print(f"{seconds:g}s of history at {FPS} FPS, {object_count} objects")
+    print("guards  keyframe every  KB/second  record ms/frame  worst restore ms")
+    for guard_count in guard_counts:
+        for interval in intervals:
+            rng = random.Random(0)
+            guards = [Guard(rng.uniform(100, 700), rng.uniform(100, 500)) for _ in range(guard_count)]
+            kinds = ["rift", "pressure_plate", "moving_platform", "portal", "timed_platform"]
+            objects = [create_object(kinds[i % len(kinds)], rng.uniform(0, 760), rng.uniform(0, 560))
+                       for i in range(object_count)]
+            for obj in objects:
+                if obj.type == "timed_platform":
+                    obj.trigger()
+            history = WorldHistory(seconds, interval)
+            record_time = 0.0
+            for _ in range(frames):
+                for guard in guards:
+                    guard.update(dt, None, [])
+                for obj in objects:
+                    obj.update(dt)
+                start = time.perf_counter()
+                history.record((("guards", guards), ("objects", objects), ("clones", [])))
+                record_time += time.perf_counter() - start
+            
+            # Worst case: the frame just before a keyframe
+            worst = 0.0
+            for index in range(len(history) - interval, len(history)):
+                start = time.perf_counter()
+                history.restore(index)
+                worst = max(worst, time.perf_counter() - start)
+            print(f"{guard_count:6}  {interval:14}  {history.memory_usage() / 1024 / seconds:9.1f}"
+                  f"  {1000 * record_time / frames:15.3f}  {1000 * worst:16.3f}")
+
+if __name__ == "__main__":
+    benchmark()
+
+# =============================================================================
+
@@ -1,137 +1,239 @@
 # quantum_shift/utils/pathfinding.py
-import pygame
 import heapq
 import math
+from array import array
 from settings import *
 
-class PathfindingNode:
-    """Node for A* pathfinding"""
-    def __init__(self, x, y, g=0, h=0, parent=None):
-        self.x = x
-        self.y = y
-        self.g = g  # Distance from start
-        self.h = h  # Heuristic (distance to goal)
-        self.f = g + h  # Total cost
-        self.parent = parent
-    
-    def __lt__(self, other):
-        return self.f < other.f
-    
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
-    
-    def __hash__(self):
-        return hash((self.x, self.y))
+# Integer move costs: octile distance scaled by 10
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
 
 class Pathfinder:
-    """A* pathfinding implementation"""
-    def __init__(self):
+    """A* pathfinding implementation
+    
+    The walkability grid is cached and only rebuilt when the obstacles' tile
+    footprint changes. Searches run over flat arrays indexed by cell
+    (y * grid_width + x); a cell's g score and parent only count when its
+    stamp matches the current search, so nothing is cleared between calls.
+    Stale heap entries are skipped when popped rather than removed.
+    
+    A diagonal step is only allowed when both tiles it passes between are
+    open, so paths never cut the corner of a wall.
+    """
+    def __init__(self, grid_width=None, grid_height=None):
         self.grid_size = 32  # Pathfinding grid resolution
         self.directions = [
             (-1, -1), (-1, 0), (-1, 1),
             (0, -1),           (0, 1),
             (1, -1),  (1, 0),  (1, 1)
         ]
+        self.grid_version = 0  # bumped whenever blocked changes
+        self.resize(grid_width or SCREEN_WIDTH // self.grid_size,
+                    grid_height or SCREEN_HEIGHT // self.grid_size)
     
-    def heuristic(self, node1, node2):
-        """Calculate heuristic distance between nodes"""
-        return math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
-    
-    def get_neighbors(self, node, grid):
-        """Get valid neighboring nodes"""
-        neighbors = []
+    def resize(self, grid_width, grid_height):
+        """Allocate the grid and search arrays for a new size"""
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        cells = self.grid_width * self.grid_height
         
-        for dx, dy in self.directions:
-            new_x = node.x + dx
-            new_y = node.y + dy
-            
-            if (0 <= new_x < len(grid[0]) and 
-                0 <= new_y < len(grid) and 
-                grid[new_y][new_x] == 0):  # 0 = walkable
-                
-                neighbors.append(PathfindingNode(new_x, new_y))
+        # Cached walkability grid: 1 = blocked. Solid tiles are always
+        # blocked; obstacles are added on top by update_obstacles
+        self.tile_blocked = bytearray(cells)
+        self.blocked = bytearray(cells)
+        self.obstacle_key = None
+        self.grid_version += 1
+        
+        # (neighbour cell, move cost, the two cells a diagonal passes between)
+        # for every cell; a straight move lists the neighbour itself twice
+        self.neighbours = []
+        for cell in range(cells):
+            x, y = cell % self.grid_width, cell // self.grid_width
+            moves = []
+            for dx, dy in self.directions:
+                if not (0 <= x + dx < self.grid_width and 0 <= y + dy < self.grid_height):
+                    continue
+                neighbour = (y + dy) * self.grid_width + x + dx
+                if dx and dy:
+                    moves.append((neighbour, DIAGONAL_COST,
+                                  y * self.grid_width + x + dx, (y + dy) * self.grid_width + x))
+                else:
+                    moves.append((neighbour, STRAIGHT_COST, neighbour, neighbour))
+            self.neighbours.append(moves)
+        
+        # Search state, reused by every search
+        self.g = array('i', bytes(4 * cells))
+        self.parent = array('i', bytes(4 * cells))
+        self.seen = array('I', bytes(4 * cells))
+        self.closed = array('I', bytes(4 * cells))
+        self.search_id = 0
+        self.last_cost = 0
+    
+    def load_tiles(self, tile_map, solid_tiles):
+        """Size the grid to a level's tile map and block its solid tiles"""
+        self.resize(max((len(row) for row in tile_map), default=0), len(tile_map))
+        for y, row in enumerate(tile_map):
+            for x, tile in enumerate(row):
+                if tile in solid_tiles:
+                    self.tile_blocked[y * self.grid_width + x] = 1
+        self.blocked = bytearray(self.tile_blocked)
+        self.grid_version += 1
+    
+    def octile(self, cell, goal):
+        """Integer octile distance between two cells"""
+        dx = abs(cell % self.grid_width - goal % self.grid_width)
+        dy = abs(cell // self.grid_width - goal // self.grid_width)
+        return STRAIGHT_COST * (dx + dy) + (DIAGONAL_COST - 2 * STRAIGHT_COST) * min(dx, dy)
+    
+    def update_obstacles(self, obstacles):
+        """Rebuild the cached grid if the obstacles cover different tiles; returns True if rebuilt"""
+        footprints = []
+        for obstacle in obstacles or ():
+            footprints.append((int(obstacle.x // self.grid_size), int(obstacle.y // self.grid_size),
+                               int(obstacle.width // self.grid_size) + 1,
+                               int(obstacle.height // self.grid_size) + 1))
+        key = tuple(footprints)
+        if key == self.obstacle_key:
+            return False
         
-        return neighbors
+        self.obstacle_key = key
+        self.blocked = bytearray(self.tile_blocked)
+        self.grid_version += 1
+        for obs_x, obs_y, obs_w, obs_h in footprints:
+            for y in range(max(0, obs_y), min(obs_y + obs_h, self.grid_height)):
+                for x in range(max(0, obs_x), min(obs_x + obs_w, self.grid_width)):
+                    self.blocked[y * self.grid_width + x] = 1  # 1 = blocked
+        return True
+    
+    def invalidate(self):
+        """Force the grid to be rebuilt on the next search"""
+        self.obstacle_key = None
     
     def find_path(self, start_pos, goal_pos, obstacles=None):
         """Find path using A* algorithm"""
+        self.update_obstacles(obstacles)
+        
         # Convert world coordinates to grid coordinates
-        start_grid = (int(start_pos[0] // self.grid_size), int(start_pos[1] // self.grid_size))
-        goal_grid = (int(goal_pos[0] // self.grid_size), int(goal_pos[1] // self.grid_size))
-        
-        # Create simplified grid
-        grid_width = SCREEN_WIDTH // self.grid_size
-        grid_height = SCREEN_HEIGHT // self.grid_size
-        grid = [[0 for _ in range(grid_width)] for _ in range(grid_height)]
-        
-        # Mark obstacles
-        if obstacles:
-            for obstacle in obstacles:
-                obs_x = int(obstacle.x // self.grid_size)
-                obs_y = int(obstacle.y // self.grid_size)
-                obs_w = int(obstacle.width // self.grid_size) + 1
-                obs_h = int(obstacle.height // self.grid_size) + 1
-                
-                for y in range(obs_y, min(obs_y + obs_h, grid_height)):
-                    for x in range(obs_x, min(obs_x + obs_w, grid_width)):
-                        if 0 <= x < grid_width and 0 <= y < grid_height:
-                            grid[y][x] = 1  # 1 = blocked
+        start_x, start_y = int(start_pos[0] // self.grid_size), int(start_pos[1] // self.grid_size)
+        goal_x, goal_y = int(goal_pos[0] // self.grid_size), int(goal_pos[1] // self.grid_size)
         
         # Check bounds
-        if (start_grid[0] < 0 or start_grid[0] >= grid_width or
-            start_grid[1] < 0 or start_grid[1] >= grid_height or
-            goal_grid[0] < 0 or goal_grid[0] >= grid_width or
-            goal_grid[1] < 0 or goal_grid[1] >= grid_height):
+        if not (0 <= start_x < self.grid_width and 0 <= start_y < self.grid_height and
+                0 <= goal_x < self.grid_width and 0 <= goal_y < self.grid_height):
             return []
         
-        # Initialize nodes
-        start_node = PathfindingNode(start_grid[0], start_grid[1])
-        goal_node = PathfindingNode(goal_grid[0], goal_grid[1])
+        cells = self.search(start_y * self.grid_width + start_x, goal_y * self.grid_width + goal_x)
+        # Convert back to world coordinates
+        return [self.cell_center(cell) for cell in cells]
+    
+    def cell_center(self, cell):
+        """World coordinates of the centre of a cell"""
+        half = self.grid_size // 2
+        return (cell % self.grid_width * self.grid_size + half,
+                cell // self.grid_width * self.grid_size + half)
+    
+    def search(self, start, goal, bounds=None):
+        """A* between two cells over the cached grid; returns the cells from start to goal, or [].
         
-        # A* algorithm
-        open_set = [start_node]
-        closed_set = set()
+        bounds (min_x, min_y, max_x, max_y), inclusive, keeps the search inside
+        a rectangle of cells. The path's cost is left in self.last_cost.
+        """
+        self.search_id += 1
+        search_id = self.search_id
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        blocked, neighbours, octile = self.blocked, self.neighbours, self.octile
+        
+        g[start] = 0
+        parent[start] = -1
+        seen[start] = search_id
+        h = octile(start, goal)
+        open_set = [(h, h, start)]
         
         while open_set:
-            current_node = heapq.heappop(open_set)
+            _, _, cell = heapq.heappop(open_set)
+            if closed[cell] == search_id:
+                continue  # stale entry for a cell already expanded
             
-            if current_node == goal_node:
+            if cell == goal:
+                self.last_cost = g[cell]
                 # Reconstruct path
                 path = []
-                while current_node:
-                    # Convert back to world coordinates
-                    world_x = current_node.x * self.grid_size + self.grid_size // 2
-                    world_y = current_node.y * self.grid_size + self.grid_size // 2
-                    path.append((world_x, world_y))
-                    current_node = current_node.parent
-                return path[::-1]  # Reverse to get start-to-goal path
-            
-            closed_set.add(current_node)
+                while cell != -1:
+                    path.append(cell)
+                    cell = parent[cell]
+                return path[::-1]
             
-            for neighbor in self.get_neighbors(current_node, grid):
-                if neighbor in closed_set:
+            closed[cell] = search_id
+            cell_g = g[cell]
+            for neighbour, cost, side_a, side_b in neighbours[cell]:
+                if blocked[neighbour] or blocked[side_a] or blocked[side_b] or \
+                   closed[neighbour] == search_id:
                     continue
-                
-                # Calculate distances
-                g = current_node.g + self.heuristic(current_node, neighbor)
-                h = self.heuristic(neighbor, goal_node)
-                neighbor.g = g
-                neighbor.h = h
-                neighbor.f = g + h
-                neighbor.parent = current_node
-                
-                # Check if this path to neighbor is better
-                better_path = True
-                for open_node in open_set:
-                    if neighbor == open_node and neighbor.g >= open_node.g:
-                        better_path = False
-                        break
-                
-                if better_path:
-                    heapq.heappush(open_set, neighbor)
+                if bounds is not None:
+                    x, y = neighbour % self.grid_width, neighbour // self.grid_width
+                    if not (bounds[0] <= x <= bounds[2] and bounds[1] <= y <= bounds[3]):
+                        continue
+                new_g = cell_g + cost
+                if seen[neighbour] != search_id or new_g < g[neighbour]:
+                    seen[neighbour] = search_id
+                    g[neighbour] = new_g
+                    parent[neighbour] = cell
+                    h = octile(neighbour, goal)
+                    heapq.heappush(open_set, (new_g + h, h, neighbour))
         
         return []  # No path found
     
+    def search_all(self, start, goals, bounds=None):
+        """Dijkstra from start until every goal is reached; returns {goal: (cost, cells)}
+        
+        Goals that cannot be reached are left out. bounds works as in search.
+        """
+        self.search_id += 1
+        search_id = self.search_id
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        blocked, neighbours = self.blocked, self.neighbours
+        remaining = set(goals)
+        found = []
+        
+        g[start] = 0
+        parent[start] = -1
+        seen[start] = search_id
+        open_set = [(0, start)]
+        
+        while open_set and remaining:
+            cell_g, cell = heapq.heappop(open_set)
+            if closed[cell] == search_id:
+                continue
+            closed[cell] = search_id
+            if cell in remaining:
+                remaining.discard(cell)
+                found.append(cell)
+            
+            for neighbour, cost, side_a, side_b in neighbours[cell]:
+                if blocked[neighbour] or blocked[side_a] or blocked[side_b] or \
+                   closed[neighbour] == search_id:
+                    continue
+                if bounds is not None:
+                    x, y = neighbour % self.grid_width, neighbour // self.grid_width
+                    if not (bounds[0] <= x <= bounds[2] and bounds[1] <= y <= bounds[3]):
+                        continue
+                new_g = cell_g + cost
+                if seen[neighbour] != search_id or new_g < g[neighbour]:
+                    seen[neighbour] = search_id
+                    g[neighbour] = new_g
+                    parent[neighbour] = cell
+                    heapq.heappush(open_set, (new_g, neighbour))
+        
+        paths = {}
+        for goal in found:
+            path = []
+            cell = goal
+            while cell != -1:
+                path.append(cell)
+                cell = parent[cell]
+            paths[goal] = (g[goal], path[::-1])
+        return paths
+    
     def smooth_path(self, path):
         """Smooth the path by removing unnecessary waypoints"""
         if len(path) <= 2:
@@ -157,10 +259,30 @@ class Pathfinder:
         distance = math.sqrt((end[0] - start[0])**2 + (end[1] - start[1])**2)
         return distance < self.grid_size * 3
 
+def check():
+    """Sanity checks for the search rules.
+    
+    Run from the quantum_shift directory:  python -m utils.pathfinding
+    """
+    # A 5x3 grid whose only open row is the middle one
+    pathfinder = Pathfinder(5, 3)
+    for cell in range(15):
+        if cell // 5 != 1:
+            pathfinder.blocked[cell] = 1
+    assert pathfinder.search(5, 9) == [5, 6, 7, 8, 9]
+    
+    # A guard standing inside an obstacle's padded footprint can still walk out
+    pathfinder.blocked[5] = 1
+    assert pathfinder.search(5, 9) == [5, 6, 7, 8, 9]
+    
+    # No cutting the corner of a wall
+    pathfinder = Pathfinder(2, 2)
+    pathfinder.blocked[1] = 1
+    assert pathfinder.search(0, 3) == [0, 2, 3]
+    print("pathfinding checks passed")
+
+if __name__ == "__main__":
+    check()
+
 # =============================================================================
 
-# quantum_shift/utils/pathfinding.py
-import pygame
-import heapq
-import math
-from settings import *
\ No newline at end of file
@@ -1,6 +1,11 @@
+import os
+import sys
 import pygame
-import time
-import random
+
+# The game rules live in Snake/snake_core.py, shared with Snake/snake.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Snake"))
+from snake_core import SnakeGame, UP, DOWN, LEFT, RIGHT, DIED
+from snake_agent import Autopilot
 
 # Initialize pygame
 pygame.init()
@@ -27,118 +32,91 @@ clock = pygame.time.Clock()
 snake_block = 20
 snake_speed = 15
 
+# Board size in blocks
+board_width = dis_width // snake_block
+board_height = dis_height // snake_block
+
 # Font styles
 font_style = pygame.font.SysFont("bahnschrift", 25)
 score_font = pygame.font.SysFont("comicsansms", 35)
 
+KEY_DIRECTIONS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+}
+
 def your_score(score):
     value = score_font.render("Your Score: " + str(score), True, black)
     dis.blit(value, [0, 0])
 
-def our_snake(snake_block, snake_list):
-    for x in snake_list:
-        pygame.draw.rect(dis, green, [x[0], x[1], snake_block, snake_block])
+def block_rect(cell):
+    return [cell % board_width * snake_block, cell // board_width * snake_block, snake_block, snake_block]
+
+def our_snake(body):
+    for cell in body:
+        pygame.draw.rect(dis, green, block_rect(cell))
 
 def message(msg, color):
     mesg = font_style.render(msg, True, color)
     dis.blit(mesg, [dis_width / 6, dis_height / 3])
 
 def gameLoop():
-    game_over = False
+    game = SnakeGame(board_width, board_height)
+    autopilot = None
     game_close = False
+    final_score = 0
 
-    # Starting position
-    x1 = dis_width / 2
-    y1 = dis_height / 2
-
-    # Change in position
-    x1_change = 0
-    y1_change = 0
-
-    # Snake body
-    snake_List = []
-    Length_of_snake = 1
+    while True:
 
-    # Food position
-    foodx = round(random.randrange(0, dis_width - snake_block) / snake_block) * snake_block
-    foody = round(random.randrange(0, dis_height - snake_block) / snake_block) * snake_block
-
-    while not game_over:
-
-        while game_close == True:
+        while game_close:
             dis.fill(white)
             message("You Lost! Press Q-Quit or C-Play Again", red)
-            your_score(Length_of_snake - 1)
+            your_score(final_score)
             pygame.display.update()
 
             for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_q:
-                        game_over = True
-                        game_close = False
+                        pygame.quit()
+                        quit()
                     if event.key == pygame.K_c:
-                        gameLoop()
+                        game.reset()
+                        game_close = False
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                game_over = True
+                pygame.quit()
+                quit()
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT:
-                    x1_change = -snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_RIGHT:
-                    x1_change = snake_block
-                    y1_change = 0
-                elif event.key == pygame.K_UP:
-                    y1_change = -snake_block
-                    x1_change = 0
-                elif event.key == pygame.K_DOWN:
-                    y1_change = snake_block
-                    x1_change = 0
-
-        # Check if snake hits the boundary
-        if x1 >= dis_width or x1 < 0 or y1 >= dis_height or y1 < 0:
+                direction = KEY_DIRECTIONS.get(event.key)
+                # Turning back onto the body is ignored
+                if direction and direction != (-game.direction[0], -game.direction[1]):
+                    game.direction = direction
+                if event.key == pygame.K_a:
+                    autopilot = None if autopilot else Autopilot(board_width, board_height)
+
+        if autopilot is not None:
+            game.direction = autopilot.next_direction(game) or game.direction
+
+        final_score = game.score
+        if game.update() == DIED:
             game_close = True
+            continue
 
-        # Update snake position
-        x1 += x1_change
-        y1 += y1_change
         dis.fill(white)
-        
-        # Draw food
-        pygame.draw.rect(dis, red, [foodx, foody, snake_block, snake_block])
-        
-        # Update snake
-        snake_Head = []
-        snake_Head.append(x1)
-        snake_Head.append(y1)
-        snake_List.append(snake_Head)
-        
-        # Remove extra segments if snake hasn't eaten
-        if len(snake_List) > Length_of_snake:
-            del snake_List[0]
-
-        # Check if snake hits itself
-        for x in snake_List[:-1]:
-            if x == snake_Head:
-                game_close = True
-
-        # Draw snake
-        our_snake(snake_block, snake_List)
-        your_score(Length_of_snake - 1)
+        if game.food is not None:
+            pygame.draw.rect(dis, red, block_rect(game.food))
+        our_snake(game.body)
+        your_score(game.score)
 
         pygame.display.update()
 
-        # Check if snake eats food
-        if x1 == foodx and y1 == foody:
-            foodx = round(random.randrange(0, dis_width - snake_block) / snake_block) * snake_block
-            foody = round(random.randrange(0, dis_height - snake_block) / snake_block) * snake_block
-            Length_of_snake += 1
-
         clock.tick(snake_speed)
 
-    pygame.quit()
-    quit()
-
 # Start the game
-gameLoop()
\ No newline at end of file
+gameLoop()
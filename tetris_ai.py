@@ -0,0 +1,179 @@
+# tetris_ai.py - Computer player for Tetris
+# Enumerates every final placement (rotation x column, hard dropped) of the
+# current piece and of the next piece, and scores all resulting boards in one
+# NumPy batch on holes, aggregate height, bumpiness and completed lines.
+#
+# Run directly for a headless benchmark:  python tetris_ai.py [games] [max_pieces]
+import sys
+import time
+
+import numpy as np
+
+from tetris_core import (Tetris, GRID_WIDTH, GRID_HEIGHT, PIECE_MASKS, FULL_ROW,
+                         LEFT, RIGHT, ROTATE, HARD_DROP)
+
+# Weights for (aggregate height, completed lines, holes, bumpiness)
+DEFAULT_WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+
+BIT_VALUES = 1 << np.arange(GRID_WIDTH)
+
+
+def _placements(piece_type):
+    """Per distinct rotation: (rotation, left, width, row masks, lowest row of each column)"""
+    result = []
+    seen = set()
+    for rotation, (top, left, width, masks) in enumerate(PIECE_MASKS[piece_type]):
+        if masks in seen:
+            continue
+        seen.add(masks)
+        bottoms = [max(i for i, mask in enumerate(masks) if mask >> c & 1) for c in range(width)]
+        result.append((rotation, left, width, masks, bottoms))
+    return result
+
+PLACEMENTS = {piece_type: _placements(piece_type) for piece_type in PIECE_MASKS}
+
+
+def column_tops(rows):
+    """Index of the highest filled row in each column (GRID_HEIGHT if empty)"""
+    tops = [GRID_HEIGHT] * GRID_WIDTH
+    for y, row in enumerate(rows):
+        while row:
+            low = row & -row
+            x = low.bit_length() - 1
+            if tops[x] == GRID_HEIGHT:
+                tops[x] = y
+            row ^= low
+    return tops
+
+
+def drop(rows, tops, masks, bottoms, x):
+    """Hard drop a rotation at column x; returns (new rows, lines cleared) or None"""
+    y = min(tops[x + c] - bottom for c, bottom in enumerate(bottoms)) - 1
+    if y < 0:
+        return None
+    new_rows = rows[:]
+    full = False
+    for i, mask in enumerate(masks):
+        new_rows[y + i] |= mask << x
+        full = full or new_rows[y + i] == FULL_ROW
+    if not full:
+        return new_rows, 0
+    kept = [row for row in new_rows if row != FULL_ROW]
+    lines = GRID_HEIGHT - len(kept)
+    return [0] * lines + kept, lines
+
+
+def successors(rows, piece_type):
+    """Yield (rotation, box x, rows after the drop, lines cleared) for every placement"""
+    tops = column_tops(rows)
+    for rotation, left, width, masks, bottoms in PLACEMENTS[piece_type]:
+        for x in range(GRID_WIDTH - width + 1):
+            result = drop(rows, tops, masks, bottoms, x)
+            if result is not None:
+                yield rotation, x - left, result[0], result[1]
+
+
+def evaluate_boards(rows, lines, weights=DEFAULT_WEIGHTS):
+    """Score a batch of boards: rows is (N, GRID_HEIGHT) row masks, lines is (N,)"""
+    filled = (np.asarray(rows, dtype=np.int32)[:, :, None] & BIT_VALUES) != 0
+    covered = np.logical_or.accumulate(filled, axis=1)
+    heights = covered.sum(axis=1)
+    holes = (covered & ~filled).sum(axis=(1, 2))
+    bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+    features = np.stack([heights.sum(axis=1), np.asarray(lines), holes, bumpiness], axis=1)
+    return features @ np.asarray(weights, dtype=float)
+
+
+class TetrisAI:
+    def __init__(self, weights=DEFAULT_WEIGHTS, lookahead=True):
+        self.weights = weights
+        self.lookahead = lookahead
+        self.placements_evaluated = 0
+
+    def best_placement(self, game):
+        """(rotation, box x) for the current piece, or None if nothing fits"""
+        first = list(successors(game.rows, game.current_piece['type']))
+        if not first:
+            return None
+
+        if not self.lookahead:
+            boards = [rows for _, _, rows, _ in first]
+            lines = [cleared for _, _, _, cleared in first]
+            owners = list(range(len(first)))
+        else:
+            # Boards after both pieces, remembering which first placement led to each
+            boards, lines, owners, topped_out = [], [], [], []
+            next_type = game.pieces.preview(1)[0]['type']
+            for i, (_, _, rows, cleared) in enumerate(first):
+                found = False
+                for _, _, next_rows, next_cleared in successors(rows, next_type):
+                    boards.append(next_rows)
+                    lines.append(cleared + next_cleared)
+                    owners.append(i)
+                    found = True
+                if not found:
+                    # The next piece cannot be placed: never choose this whatever the weights
+                    topped_out.append(len(boards))
+                    boards.append(rows)
+                    lines.append(cleared)
+                    owners.append(i)
+
+        scores = evaluate_boards(boards, lines, self.weights)
+        if self.lookahead and topped_out:
+            scores[topped_out] = -np.inf
+        self.placements_evaluated += len(boards)
+        best = np.full(len(first), -np.inf)
+        np.maximum.at(best, np.asarray(owners), scores)
+        rotation, x, _, _ = first[int(best.argmax())]
+        return rotation, x
+
+    def actions_for(self, game, placement):
+        """Inputs that rotate and shift the current piece into place, then hard drop it"""
+        rotation, x = placement
+        piece = game.current_piece
+        count = len(PIECE_MASKS[piece['type']])
+        actions = [ROTATE] * ((rotation - piece['rotation']) % count)
+        shift = x - piece['x']
+        actions += [RIGHT if shift > 0 else LEFT] * abs(shift)
+        actions.append(HARD_DROP)
+        return actions
+
+    def play_piece(self, game):
+        """Place the current piece; returns False if no placement was possible"""
+        placement = self.best_placement(game)
+        if placement is None:
+            game.step(HARD_DROP)
+            return False
+        for action in self.actions_for(game, placement):
+            game.step(action)
+        return True
+
+
+def play_game(ai, seed, max_pieces=500):
+    """Headless game; returns (lines cleared, pieces placed)"""
+    game = Tetris(seed)
+    pieces = 0
+    while not game.game_over and pieces < max_pieces:
+        ai.play_piece(game)
+        pieces += 1
+    return game.lines_cleared, pieces
+
+
+def benchmark(games=10, max_pieces=500):
+    ai = TetrisAI()
+    start = time.perf_counter()
+    total_lines = total_pieces = 0
+    for seed in range(games):
+        lines, pieces = play_game(ai, seed, max_pieces)
+        total_lines += lines
+        total_pieces += pieces
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {total_pieces} pieces in {elapsed:.2f}s")
+    print(f"placements evaluated per second: {ai.placements_evaluated / elapsed:,.0f}")
+    print(f"time per decision: {1000 * elapsed / total_pieces:.2f} ms")
+    print(f"lines cleared per game: {total_lines / games:.1f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10,
+              int(sys.argv[2]) if len(sys.argv) > 2 else 500)
@@ -0,0 +1,382 @@
+# tetris_core.py - Headless Tetris simulation (no pygame)
+# The pygame front end in Tetris.py only draws this state and feeds it input.
+import random
+from collections import deque
+
+GRID_WIDTH = 10
+GRID_HEIGHT = 20
+
+# Inputs accepted by Tetris.step
+NONE, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP = range(6)
+
+# Tetris pieces (tetrominoes)
+PIECES = {
+    'I': [['.....',
+           '..#..',
+           '..#..',
+           '..#..',
+           '..#..'],
+          ['.....',
+           '.....',
+           '####.',
+           '.....',
+           '.....']],
+    
+    'O': [['.....',
+           '.....',
+           '.##..',
+           '.##..',
+           '.....']],
+    
+    'T': [['.....',
+           '.....',
+           '.#...',
+           '###..',
+           '.....'],
+          ['.....',
+           '.....',
+           '.#...',
+           '.##..',
+           '.#...'],
+          ['.....',
+           '.....',
+           '.....',
+           '###..',
+           '.#...'],
+          ['.....',
+           '.....',
+           '.#...',
+           '##...',
+           '.#...']],
+    
+    'S': [['.....',
+           '.....',
+           '.##..',
+           '##...',
+           '.....'],
+          ['.....',
+           '.#...',
+           '.##..',
+           '..#..',
+           '.....']],
+    
+    'Z': [['.....',
+           '.....',
+           '##...',
+           '.##..',
+           '.....'],
+          ['.....',
+           '..#..',
+           '.##..',
+           '.#...',
+           '.....']],
+    
+    'J': [['.....',
+           '.#...',
+           '.#...',
+           '##...',
+           '.....'],
+          ['.....',
+           '.....',
+           '#....',
+           '###..',
+           '.....'],
+          ['.....',
+           '.##..',
+           '.#...',
+           '.#...',
+           '.....'],
+          ['.....',
+           '.....',
+           '###..',
+           '..#..',
+           '.....']],
+    
+    'L': [['.....',
+           '..#..',
+           '..#..',
+           '.##..',
+           '.....'],
+          ['.....',
+           '.....',
+           '###..',
+           '#....',
+           '.....'],
+          ['.....',
+           '##...',
+           '.#...',
+           '.#...',
+           '.....'],
+          ['.....',
+           '.....',
+           '..#..',
+           '###..',
+           '.....']]
+}
+
+def _piece_masks(shape):
+    """(top, left, width, row masks) of a 5x5 pattern, bit 0 = leftmost filled column"""
+    cells = [(x, y) for y, row in enumerate(shape) for x, cell in enumerate(row) if cell == '#']
+    left = min(x for x, _ in cells)
+    top = min(y for _, y in cells)
+    width = max(x for x, _ in cells) - left + 1
+    bottom = max(y for _, y in cells)
+    masks = tuple(sum(1 << (x - left) for x, cy in cells if cy == y) for y in range(top, bottom + 1))
+    return top, left, width, masks
+
+# Per piece type and rotation: bounding box offsets and one bitmask per occupied row
+PIECE_MASKS = {piece_type: [_piece_masks(shape) for shape in rotations]
+               for piece_type, rotations in PIECES.items()}
+
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+# Filled (x, y) offsets inside the 5x5 box, per piece type and rotation, for drawing
+PIECE_CELLS = {piece_type: [[(x, y) for y, row in enumerate(shape) for x, cell in enumerate(row) if cell == '#']
+                            for shape in rotations]
+               for piece_type, rotations in PIECES.items()}
+
+PIECE_TYPES = tuple(PIECES)
+
+# Spawn state of every piece type; new pieces are copies of these
+SPAWN = {piece_type: {
+    'type': piece_type,
+    'x': GRID_WIDTH // 2 - 2,
+    'y': 0,
+    'rotation': 0,
+    'shape': PIECES[piece_type][0]
+} for piece_type in PIECE_TYPES}
+
+class PieceGenerator:
+    """Seedable piece sequence with a preview queue.
+    
+    randomizer 'bag' deals shuffled bags holding each of the seven pieces once;
+    'random' picks each piece uniformly, as the original game did. Piece types
+    are generated a bag (or batch) at a time and handed out from a queue.
+    """
+    
+    def __init__(self, rng, randomizer='bag', preview=3, batch=7):
+        if randomizer not in ('bag', 'random'):
+            raise ValueError(f"unknown randomizer {randomizer!r}")
+        self.rng = rng
+        self.randomizer = randomizer
+        self.preview_size = preview
+        self.batch = batch
+        self.queue = deque()
+        self.fill()
+    
+    def fill(self):
+        while len(self.queue) < self.preview_size + 1:
+            if self.randomizer == 'bag':
+                bag = list(PIECE_TYPES)
+                self.rng.shuffle(bag)
+                self.queue.extend(bag)
+            else:
+                choice = self.rng.choice
+                self.queue.extend(choice(PIECE_TYPES) for _ in range(self.batch))
+    
+    def next(self):
+        """A fresh piece at its spawn position"""
+        piece_type = self.queue.popleft()
+        self.fill()
+        return dict(SPAWN[piece_type])
+    
+    def preview(self, count=None):
+        """Spawn templates of the upcoming pieces; shared, so treat them as read-only"""
+        count = self.preview_size if count is None else count
+        return [SPAWN[self.queue[i]] for i in range(count)]
+    
+    def clone(self, rng):
+        other = PieceGenerator.__new__(PieceGenerator)
+        other.__dict__.update(self.__dict__)
+        other.rng = rng
+        other.queue = deque(self.queue)
+        return other
+
+class Tetris:
+    def __init__(self, seed=None, randomizer='bag', preview=3):
+        # Every game has a seed so it can be replayed; pass one for a fixed sequence
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.pieces = PieceGenerator(self.rng, randomizer, preview)
+        # grid holds piece types for drawing; rows holds the same cells as bitmasks (bit x = column x)
+        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.rows = [0] * GRID_HEIGHT
+        self.grid_version = 0  # bumped whenever the locked cells change, for renderers
+        self.current_piece = self.pieces.next()
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.fall_time = 0
+        self.fall_speed = 500  # milliseconds
+        self.game_over = False
+        
+    @property
+    def next_piece(self):
+        return self.pieces.preview(1)[0]
+    
+    def rotate_piece(self, piece):
+        piece_type = piece['type']
+        rotations = PIECES[piece_type]
+        new_rotation = (piece['rotation'] + 1) % len(rotations)
+        return new_rotation, rotations[new_rotation]
+    
+    def is_valid_position(self, piece, dx=0, dy=0, rotation=None):
+        if rotation is None:
+            rotation = piece['rotation']
+        top, left, width, masks = PIECE_MASKS[piece['type']][rotation]
+        
+        x = piece['x'] + dx + left
+        y = piece['y'] + dy + top
+        if x < 0 or x + width > GRID_WIDTH or y + len(masks) > GRID_HEIGHT:
+            return False
+        
+        rows = self.rows
+        for i, mask in enumerate(masks):
+            if y + i >= 0 and rows[y + i] & (mask << x):
+                return False
+        return True
+    
+    def place_piece(self, piece):
+        top, left, width, masks = PIECE_MASKS[piece['type']][piece['rotation']]
+        x = piece['x'] + left
+        y = piece['y'] + top
+        for i, mask in enumerate(masks):
+            grid_y = y + i
+            if grid_y >= 0:
+                self.rows[grid_y] |= mask << x
+                grid_row = self.grid[grid_y]
+                for bit in range(width):
+                    if mask >> bit & 1:
+                        grid_row[x + bit] = piece['type']
+        self.grid_version += 1
+    
+    def clear_lines(self):
+        kept = [y for y in range(GRID_HEIGHT) if self.rows[y] != FULL_ROW]
+        lines_cleared = GRID_HEIGHT - len(kept)
+        
+        if lines_cleared > 0:
+            self.rows = [0] * lines_cleared + [self.rows[y] for y in kept]
+            self.grid = ([[0 for _ in range(GRID_WIDTH)] for _ in range(lines_cleared)] +
+                         [self.grid[y] for y in kept])
+            self.grid_version += 1
+            self.lines_cleared += lines_cleared
+            self.score += lines_cleared * 100 * self.level
+            self.level = self.lines_cleared // 10 + 1
+            self.fall_speed = max(50, 500 - (self.level - 1) * 50)
+        
+        return lines_cleared
+    
+    def is_game_over(self):
+        return not self.is_valid_position(self.current_piece)
+    
+    def move_piece(self, dx, dy):
+        if self.is_valid_position(self.current_piece, dx, dy):
+            self.current_piece['x'] += dx
+            self.current_piece['y'] += dy
+            return True
+        return False
+    
+    def rotate_current_piece(self):
+        new_rotation, new_shape = self.rotate_piece(self.current_piece)
+        if self.is_valid_position(self.current_piece, rotation=new_rotation):
+            self.current_piece['rotation'] = new_rotation
+            self.current_piece['shape'] = new_shape
+    
+    def drop_piece(self):
+        if not self.move_piece(0, 1):
+            self.place_piece(self.current_piece)
+            self.clear_lines()
+            self.current_piece = self.pieces.next()
+            return True
+        return False
+    
+    def hard_drop(self):
+        while self.move_piece(0, 1):
+            self.score += 1
+        self.drop_piece()
+    
+    def update(self, dt):
+        """Advance gravity by dt milliseconds"""
+        self.fall_time += dt
+        if self.fall_time >= self.fall_speed:
+            self.drop_piece()
+            self.fall_time = 0
+    
+    def step(self, action=NONE, dt=0):
+        """Apply one input, then advance gravity by dt milliseconds.
+        
+        Returns the number of lines cleared during the step.
+        """
+        if self.game_over:
+            return 0
+        
+        lines_before = self.lines_cleared
+        if action == LEFT:
+            self.move_piece(-1, 0)
+        elif action == RIGHT:
+            self.move_piece(1, 0)
+        elif action == ROTATE:
+            self.rotate_current_piece()
+        elif action == SOFT_DROP:
+            self.drop_piece()
+        elif action == HARD_DROP:
+            self.hard_drop()
+        
+        if dt:
+            self.update(dt)
+        self.game_over = self.is_game_over()
+        return self.lines_cleared - lines_before
+    
+    def clone(self):
+        """Independent copy, including the random number generator"""
+        other = Tetris.__new__(Tetris)
+        other.__dict__.update(self.__dict__)
+        other.grid = [row[:] for row in self.grid]
+        other.rows = self.rows[:]
+        other.current_piece = dict(self.current_piece)
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        other.pieces = self.pieces.clone(other.rng)
+        return other
+    
+    def to_dict(self):
+        """JSON-serializable snapshot of the whole game"""
+        version, internal, gauss = self.rng.getstate()
+        return {
+            'seed': self.seed,
+            'rng': [version, list(internal), gauss],
+            'grid': [row[:] for row in self.grid],
+            'current_piece': {k: v for k, v in self.current_piece.items() if k != 'shape'},
+            'randomizer': self.pieces.randomizer,
+            'preview': self.pieces.preview_size,
+            'batch': self.pieces.batch,
+            'queue': list(self.pieces.queue),
+            'score': self.score,
+            'level': self.level,
+            'lines_cleared': self.lines_cleared,
+            'fall_time': self.fall_time,
+            'fall_speed': self.fall_speed,
+            'game_over': self.game_over,
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        game = cls.__new__(cls)
+        game.seed = data['seed']
+        version, internal, gauss = data['rng']
+        game.rng = random.Random()
+        game.rng.setstate((version, tuple(internal), gauss))
+        game.grid = [row[:] for row in data['grid']]
+        game.rows = [sum(1 << x for x, cell in enumerate(row) if cell != 0) for row in game.grid]
+        game.grid_version = 0
+        game.current_piece = dict(data['current_piece'])
+        game.current_piece['shape'] = PIECES[game.current_piece['type']][game.current_piece['rotation']]
+        game.pieces = PieceGenerator.__new__(PieceGenerator)
+        game.pieces.rng = game.rng
+        game.pieces.randomizer = data['randomizer']
+        game.pieces.preview_size = data['preview']
+        game.pieces.batch = data['batch']
+        game.pieces.queue = deque(data['queue'])
+        for key in ('score', 'level', 'lines_cleared', 'fall_time', 'fall_speed', 'game_over'):
+            setattr(game, key, data[key])
+        return game
@@ -0,0 +1,118 @@
+# tetris_replay.py - Record and replay Tetris sessions on the headless core
+# A recording is the game's seed plus every step() call (input and elapsed ms),
+# which is all the core needs to reproduce a session exactly.
+#
+# Replay a file headless:  python tetris_replay.py session.ttr [--realtime]
+import hashlib
+import json
+import struct
+import sys
+import time
+
+from tetris_core import Tetris
+
+MAGIC = b"TTRP"
+VERSION = 2
+HEADER = struct.Struct("<4sBQB")
+RANDOMIZERS = ('bag', 'random')
+END = 0xFF
+
+# File layout: header (magic, version, seed, randomizer), then one event per step:
+# an action byte followed by the elapsed milliseconds as a varint, then an
+# END byte and the SHA-1 digest of the final game state.
+
+
+def state_digest(game):
+    """SHA-1 of the full game state, to check a replay ended where the recording did"""
+    return hashlib.sha1(json.dumps(game.to_dict(), sort_keys=True).encode()).digest()
+
+
+def write_varint(data, value):
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    """Wraps a game: call step() on the recorder instead of on the game"""
+
+    def __init__(self, game):
+        self.game = game
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, game.seed,
+                                          RANDOMIZERS.index(game.pieces.randomizer)))
+
+    def step(self, action=0, dt=0):
+        self.data.append(action)
+        write_varint(self.data, int(dt))
+        return self.game.step(action, dt)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.data)
+            f.write(bytes((END,)))
+            f.write(state_digest(self.game))
+
+
+class Replayer:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, randomizer = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a Tetris recording")
+        self.randomizer = RANDOMIZERS[randomizer]
+
+        self.events = []
+        pos = HEADER.size
+        while data[pos] != END:
+            action = data[pos]
+            dt, pos = read_varint(data, pos + 1)
+            self.events.append((action, dt))
+        self.digest = data[pos + 1:pos + 21]
+
+    def run(self, realtime=False, on_frame=None):
+        """Re-run the session and return the final game.
+
+        With realtime the elapsed times are honoured; otherwise it runs as fast
+        as possible. on_frame(game) is called after every step that advanced time.
+        """
+        game = Tetris(self.seed, self.randomizer)
+        clock = 0.0
+        start = time.perf_counter()
+        for action, dt in self.events:
+            game.step(action, dt)
+            if dt:
+                if realtime:
+                    clock += dt / 1000
+                    delay = start + clock - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                if on_frame is not None:
+                    on_frame(game)
+        return game
+
+    def verify(self, game):
+        """True if game ended in exactly the recorded state"""
+        return state_digest(game) == self.digest
+
+
+if __name__ == "__main__":
+    replayer = Replayer(sys.argv[1])
+    start = time.perf_counter()
+    final = replayer.run(realtime="--realtime" in sys.argv)
+    elapsed = time.perf_counter() - start
+    print(f"{len(replayer.events)} steps in {elapsed:.3f}s ({len(replayer.events) / elapsed:,.0f} steps/s)")
+    print(f"score {final.score}, lines {final.lines_cleared}, "
+          f"{'matches' if replayer.verify(final) else 'DIFFERS FROM'} the recorded final state")
@@ -0,0 +1,137 @@
+# tetris_tuning.py - Tune the Tetris AI evaluation weights with the cross-entropy method
+# Every candidate weight vector plays the same seeded headless games, spread over
+# a process pool. Per-generation statistics go to a CSV file and the search
+# state to a JSON checkpoint, so an interrupted run picks up where it stopped.
+#
+#   python tetris_tuning.py --generations 20 --population 40 --games 8
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tetris_ai import TetrisAI, DEFAULT_WEIGHTS, play_game
+
+FEATURES = ("aggregate_height", "lines", "holes", "bumpiness")
+
+
+def play(task):
+    """Worker: lines cleared by one weight vector in one seeded game"""
+    weights, seed, max_pieces, lookahead = task
+    return play_game(TetrisAI(weights, lookahead), seed, max_pieces)[0]
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, state):
+    # Write then rename, so a crash mid-write keeps the previous checkpoint
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def trim_stats(path, generations):
+    # A crash between writing a row and saving the checkpoint leaves a row for
+    # a generation that will be run again; drop rows the checkpoint doesn't cover
+    if not os.path.exists(path):
+        return
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    kept = rows[:1] + [row for row in rows[1:] if row and int(row[0]) < generations]
+    if len(kept) != len(rows):
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(kept)
+
+
+def tune(generations=20, population=40, elite_fraction=0.25, games=8, max_pieces=500,
+         lookahead=False, workers=None, seed=0, checkpoint="tetris_tuning.json",
+         stats="tetris_tuning.csv"):
+    state = load_checkpoint(checkpoint)
+    if state is None:
+        state = {
+            "generation": 0,
+            "mean": list(DEFAULT_WEIGHTS),
+            "std": [0.5] * len(DEFAULT_WEIGHTS),
+            "best_weights": list(DEFAULT_WEIGHTS),
+            "best_score": None,
+            "rng": None,
+        }
+    rng = random.Random(seed)
+    if state["rng"] is not None:
+        version, internal, gauss = state["rng"]
+        rng.setstate((version, tuple(internal), gauss))
+
+    elite_count = max(1, int(population * elite_fraction))
+    trim_stats(stats, state["generation"])
+    new_stats = not os.path.exists(stats)
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(stats, "a", newline="") as stats_file:
+        writer = csv.writer(stats_file)
+        if new_stats:
+            writer.writerow(["generation", "best", "mean", "elite_mean", "seconds"] +
+                            [f"mean_{name}" for name in FEATURES] + [f"std_{name}" for name in FEATURES])
+
+        while state["generation"] < generations:
+            start = time.perf_counter()
+            generation = state["generation"]
+            candidates = [[rng.gauss(m, s) for m, s in zip(state["mean"], state["std"])]
+                          for _ in range(population)]
+            # Same games for every candidate in a generation; new games each generation
+            seeds = [seed * 1000003 + generation * games + game for game in range(games)]
+            tasks = [(weights, game_seed, max_pieces, lookahead)
+                     for weights in candidates for game_seed in seeds]
+            chunk = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+            results = list(pool.map(play, tasks, chunksize=chunk))
+            scores = [sum(results[i * games:(i + 1) * games]) / games for i in range(population)]
+
+            ranked = sorted(range(population), key=lambda i: scores[i], reverse=True)
+            elite = [candidates[i] for i in ranked[:elite_count]]
+            state["mean"] = [sum(column) / elite_count for column in zip(*elite)]
+            # Small noise floor keeps the search from collapsing early
+            state["std"] = [(sum((w - m) ** 2 for w in column) / elite_count) ** 0.5 + 0.02
+                            for column, m in zip(zip(*elite), state["mean"])]
+            if state["best_score"] is None or scores[ranked[0]] > state["best_score"]:
+                state["best_score"] = scores[ranked[0]]
+                state["best_weights"] = candidates[ranked[0]]
+            state["generation"] = generation + 1
+            version, internal, gauss = rng.getstate()
+            state["rng"] = [version, list(internal), gauss]
+
+            elapsed = time.perf_counter() - start
+            writer.writerow([generation, scores[ranked[0]], sum(scores) / population,
+                             sum(scores[i] for i in ranked[:elite_count]) / elite_count, round(elapsed, 2)] +
+                            state["mean"] + state["std"])
+            stats_file.flush()
+            save_checkpoint(checkpoint, state)
+            print(f"generation {generation}: best {scores[ranked[0]]:.1f} lines, "
+                  f"mean {sum(scores) / population:.1f}, {elapsed:.1f}s")
+
+    return state["best_weights"], state["best_score"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the Tetris AI weights with the cross-entropy method")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--population", type=int, default=40)
+    parser.add_argument("--elite", type=float, default=0.25, help="fraction of candidates kept each generation")
+    parser.add_argument("--games", type=int, default=8, help="seeded games per candidate")
+    parser.add_argument("--max-pieces", type=int, default=500, help="pieces per game before it is stopped")
+    parser.add_argument("--lookahead", action="store_true", help="evaluate with the two-piece search")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default="tetris_tuning.json")
+    parser.add_argument("--stats", default="tetris_tuning.csv")
+    args = parser.parse_args()
+    best_weights, best_score = tune(args.generations, args.population, args.elite, args.games,
+                                    args.max_pieces, args.lookahead, args.workers, args.seed,
+                                    args.checkpoint, args.stats)
+    if best_score is None:
+        print("no generations run; weights:", dict(zip(FEATURES, best_weights)))
+    else:
+        print("best weights:", dict(zip(FEATURES, best_weights)), f"({best_score:.1f} lines per game)")